@@ -0,0 +1 @@
+# discord-ext-fslash - Benchmarks
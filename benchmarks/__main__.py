@@ -0,0 +1,57 @@
+# discord-ext-fslash - Benchmarks
+# 使い方: python -m benchmarks [-o result.json] [-n NUMBER]
+# 全てのベンチマークをそれぞれ別のプロセスで実行して、結果をJSONで出力します。
+
+from argparse import ArgumentParser
+from json import dumps, loads
+from platform import python_version
+from subprocess import run
+import sys
+
+import discord
+
+from discord.ext import fslash
+
+
+def _run(module: str, **kwargs) -> dict:
+    # `extend_force_slash`は一度しか実行できないので、それぞれ新しいプロセスで実行する。
+    process = run(
+        (sys.executable, "-m", f"benchmarks.{module}", dumps(kwargs)),
+        capture_output=True, text=True, check=True
+    )
+    return loads(process.stdout.splitlines()[-1])
+
+
+def main() -> None:
+    parser = ArgumentParser(description="Runs the offline benchmarks of discord-ext-fslash.")
+    parser.add_argument("-o", "--output", help="The file to write the result to.")
+    parser.add_argument(
+        "-n", "--number", type=int, default=10000,
+        help="How many times each command is run in the dispatch benchmarks."
+    )
+    args = parser.parse_args()
+
+    scenarios = {"context": _run("context", number=args.number * 10)}
+    for name, kwargs in (
+        ("fslash", {}), ("fslash_deferred", {"deferred": True}), ("hybrid", {"hybrid": True})
+    ):
+        scenarios[f"registration_{name}"] = _run("registration", **kwargs)
+    for mode in ("OFFICIAL", "OFFICIAL_LIGHT", "UNOFFICIAL"):
+        scenarios[f"dispatch_{mode.lower()}"] = _run(
+            "dispatch", number=args.number, context_mode=mode
+        )
+    scenarios["dispatch_hybrid"] = _run("dispatch", number=args.number, hybrid=True)
+
+    result = dumps({
+        "python": python_version(), "discord.py": discord.__version__,
+        "fslash": fslash.__version__, "scenarios": scenarios
+    }, indent=2)
+    if args.output is None:
+        print(result)
+    else:
+        with open(args.output, "w") as f:
+            f.write(result)
+
+
+if __name__ == "__main__":
+    main()
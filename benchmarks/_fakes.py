@@ -0,0 +1,148 @@
+# discord-ext-fslash - Benchmarks - Fake objects
+
+from __future__ import annotations
+
+from typing import Any
+
+from datetime import datetime, timezone
+from json import dumps, loads
+from sys import argv
+from time import perf_counter
+
+from discord.ext import commands
+import discord
+
+
+class FakeResponse:
+    "The fake of `discord.InteractionResponse`. It records the responses."
+
+    def __init__(self):
+        self.responses = []
+        self._done = False
+
+    def is_done(self) -> bool:
+        return self._done
+
+    async def send_message(self, content=None, **kwargs):
+        self.responses.append(("send_message", content, kwargs))
+        self._done = True
+
+    async def defer(self, **kwargs):
+        self.responses.append(("defer", None, kwargs))
+        self._done = True
+
+
+class FakeFollowup:
+    "The fake of `discord.Webhook` of `discord.Interaction.followup`."
+
+    def __init__(self, response: FakeResponse):
+        self.response = response
+
+    async def send(self, content=None, **kwargs):
+        self.response.responses.append(("followup", content, kwargs))
+
+
+class FakeChannel:
+    "The fake of a text channel."
+
+    id = 1
+
+    async def send(self, content=None, **kwargs):
+        ...
+
+    async def fetch_message(self, id):
+        ...
+
+    def history(self, **kwargs):
+        ...
+
+    async def pins(self):
+        ...
+
+
+class FakeUser:
+    "The fake of `discord.User`."
+
+    id = 2
+    name = "fslash"
+    bot = False
+
+
+class FakeNamespace:
+    "The fake of `discord.app_commands.Namespace`."
+
+    def __init__(self, **values: Any):
+        self.__dict__.update(values)
+
+    def __iter__(self):
+        return iter(self.__dict__.items())
+
+
+class FakeInteraction:
+    """The fake of `discord.Interaction` of a slash command.
+    It has only the attributes that fslash and `commands.Context.from_interaction` use."""
+
+    def __init__(self, client, command=None, **values: Any):
+        self.client, self.command, self._state = client, command, client._connection
+        self.id, self.channel_id, self.guild_id = 3, FakeChannel.id, None
+        self.message, self.guild = None, None
+        self.user, self.channel = FakeUser(), FakeChannel()
+        self.created_at = datetime.now(timezone.utc)
+        self.data, self.namespace, self.extras = {"type": 1}, FakeNamespace(**values), {}
+        self.command_failed = False
+        self.response = FakeResponse()
+        self.followup = FakeFollowup(self.response)
+        self._baton = None
+
+    async def edit_original_response(self, **kwargs):
+        self.response.responses.append(("edit_original_response", None, kwargs))
+
+
+class FakeHTTP:
+    "The fake of `discord.http.HTTPClient` for `CommandTree.sync`. It records the uploads and the fetches."
+
+    def __init__(self):
+        self.uploads = []
+        self.fetches = []
+
+    async def get_global_commands(self, application_id):
+        self.fetches.append(None)
+        return []
+
+    async def get_guild_commands(self, application_id, guild_id):
+        self.fetches.append(guild_id)
+        return []
+
+    async def bulk_upsert_global_commands(self, application_id, payload):
+        self.uploads.append((None, payload))
+        return []
+
+    async def bulk_upsert_guild_commands(self, application_id, guild_id, payload):
+        self.uploads.append((guild_id, payload))
+        return []
+
+
+def make_bot() -> commands.Bot:
+    "Makes a bot that does not connect to Discord."
+    bot = commands.Bot(command_prefix="!", intents=discord.Intents.default())
+    bot._connection.application_id = 4
+    bot.tree._http = FakeHTTP() # type: ignore
+    return bot
+
+
+async def measure(function, number: int) -> float:
+    "Runs the coroutine function `number` times and returns nanoseconds per run."
+    start = perf_counter()
+    for _ in range(number):
+        await function()
+    return (perf_counter() - start) / number * 1e9
+
+
+def print_result(result: dict) -> None:
+    "Prints the result as JSON so that `benchmarks.__main__` can read it."
+    print(dumps(result))
+
+
+def get_kwargs() -> dict[str, Any]:
+    "Gets keyword arguments passed as JSON in the command line argument."
+    return loads(argv[1]) if len(argv) > 1 else {}
@@ -0,0 +1,50 @@
+# discord-ext-fslash - Benchmarks - Context
+
+from asyncio import run
+from time import perf_counter
+from timeit import timeit
+
+from discord.ext import commands
+import discord
+
+from discord.ext.fslash import Context, OfficialContext
+
+from ._fakes import FakeInteraction, print_result, get_kwargs
+
+
+class _FakeAppCommand:
+    name = "fake"
+
+
+async def _from_interaction(interaction: FakeInteraction, number: int) -> float:
+    start = perf_counter()
+    for _ in range(number):
+        await commands.Context.from_interaction(interaction) # type: ignore
+    return perf_counter() - start
+
+
+def main(number: int = 100000) -> dict:
+    """Measures the time to make `Context` and to access its attributes.
+
+    Parameters
+    ----------
+    number : int
+        How many times each one is measured."""
+    bot = commands.Bot(command_prefix="!", intents=discord.Intents.default())
+    interaction = FakeInteraction(bot, _FakeAppCommand())
+    ctx = Context(interaction, {}, None, bot)
+    return {
+        "context_ns": timeit(lambda: Context(interaction, {}, None, bot), number=number)
+            / number * 1e9,
+        "context_access_ns": timeit(
+            lambda: (ctx.author, ctx.guild, ctx.channel), number=number
+        ) / number * 1e9,
+        "from_interaction_ns": run(_from_interaction(interaction, number)) / number * 1e9,
+        "official_context_ns": timeit(
+            lambda: OfficialContext(interaction, {}, None, bot), number=number
+        ) / number * 1e9
+    }
+
+
+if __name__ == "__main__":
+    print_result(main(**get_kwargs()))
@@ -0,0 +1,94 @@
+# discord-ext-fslash - Benchmarks - Dispatch
+
+from asyncio import run as run_async
+from types import SimpleNamespace
+
+from discord.ext import commands
+from discord import app_commands
+
+from ._fakes import FakeInteraction, FakeNamespace, make_bot, measure, print_result, get_kwargs
+
+
+class Number(commands.Converter):
+    "The converter used to measure the overhead of the transformer made by fslash."
+
+    async def convert(self, ctx, argument: str) -> int:
+        return int(argument)
+
+
+_CHOICES = [app_commands.Choice(name=f"choice{index}", value=index) for index in range(25)]
+
+
+async def run(
+    number: int = 10000, context_mode: str = "OFFICIAL", hybrid: bool = False
+) -> dict:
+    """Measures the time to run a command by a slash with fake interactions.
+    It must be run in a new process, because `extend_force_slash` can only be called once.
+
+    Parameters
+    ----------
+    number : int
+        How many times each command is run.
+    context_mode : str
+        The name of `ContextMode` used by fslash.
+    hybrid : bool
+        Whether to use hybrid commands of discord.py instead of fslash."""
+    bot = make_bot()
+    if hybrid:
+        command = commands.hybrid_command
+        # `Bot.get_context`は偽のインタラクションを`discord.Interaction`と判定しないので、直接Contextを作る。
+        async def get_context(origin, /, *, cls=commands.Context):
+            return await cls.from_interaction(origin) # type: ignore
+        bot.get_context = get_context # type: ignore
+    else:
+        from discord.ext.fslash import extend_force_slash, ContextMode
+        extend_force_slash(bot, context_mode=ContextMode[context_mode])
+        command = commands.command
+
+    @command()
+    async def plain(ctx, text: str):
+        ...
+
+    @command()
+    async def converter(ctx, value: Number):
+        ...
+
+    @command()
+    @app_commands.choices(choice=_CHOICES)
+    async def choice(ctx, choice: app_commands.Choice[int]):
+        ...
+
+    for command_ in (plain, converter, choice):
+        bot.add_command(command_)
+    # `Bot.dispatch`を使えるようにイベントループを設定する。
+    await bot._async_setup_hook()
+
+    result = {}
+    for name, values in (
+        ("plain", {"text": "fslash"}), ("converter", {"value": "1"}),
+        ("choice", {"choice": 24})
+    ):
+        app_command = bot.tree.get_command(name)
+        assert app_command is not None
+        namespace = FakeNamespace(**values)
+        result[f"dispatch_{name}_ns"] = await measure(
+            lambda: app_command._invoke_with_namespace( # type: ignore
+                FakeInteraction(bot, app_command, **values), namespace # type: ignore
+            ), number
+        )
+
+    # コマンドフレームワークでの実行時のChoiceの処理を計測する。ハイブリッドコマンドはこれに対応していない。
+    if hybrid:
+        return result
+    ctx = SimpleNamespace(bot=bot, command=choice)
+    parameter = choice.clean_params["choice"]
+    result["prefix_choice_ns"] = await measure(
+        lambda: commands.core.run_converters( # type: ignore
+            ctx, parameter.converter, "choice24", parameter
+        ), number
+    )
+    return result
+
+
+if __name__ == "__main__":
+    print_result(run_async(run(**get_kwargs())))
@@ -0,0 +1,99 @@
+# discord-ext-fslash - Benchmarks - Registration
+
+from asyncio import run as run_async
+from time import perf_counter
+
+from discord.ext import commands
+
+from ._fakes import make_bot, print_result, get_kwargs
+
+
+def _make_callback(cog: bool = False):
+    # コマンドごとに別の関数を作る。
+    if cog:
+        async def cog_callback(self, ctx, number: int, text: str):
+            ...
+        return cog_callback
+    async def callback(ctx, number: int, text: str):
+        ...
+    return callback
+
+
+async def run(
+    commands_: int = 50, groups: int = 10, subcommands: int = 20,
+    cogs: int = 5, cog_commands: int = 5, depth: int = 4,
+    hybrid: bool = False, deferred: bool = False
+) -> dict:
+    """Measures the time to make the commands and register them as slashes.
+    It must be run in a new process, because `extend_force_slash` can only be called once.
+
+    Parameters
+    ----------
+    commands_ : int
+        The number of top-level commands.
+    groups : int
+        The number of group commands.
+    subcommands : int
+        The number of subcommands of each group command.
+    cogs : int
+        The number of cogs.
+    cog_commands : int
+        The number of commands of each cog.
+    depth : int
+        The depth of nested group commands. Hybrid commands can not be nested deeper than 2, so it is limited to 2 for them.
+    hybrid : bool
+        Whether to use hybrid commands of discord.py instead of fslash.
+    deferred : bool
+        Whether to use the deferred registration mode of fslash."""
+    bot = make_bot()
+    if hybrid:
+        command, group = commands.hybrid_command, commands.hybrid_group
+        depth = min(depth, 2)
+    else:
+        from discord.ext.fslash import extend_force_slash
+        extend_force_slash(bot, deferred_registration=deferred)
+        command, group = commands.command, commands.group
+
+    start = perf_counter()
+    for index in range(commands_):
+        bot.add_command(command(name=f"command{index}")(_make_callback()))
+    for index in range(groups):
+        parent = group(name=f"group{index}")(_make_callback())
+        bot.add_command(parent)
+        for sub_index in range(subcommands):
+            parent.command(name=f"sub{sub_index}")(_make_callback())
+    parent = None
+    for index in range(depth):
+        if parent is None:
+            bot.add_command(parent := group(name=f"nested{index}")(_make_callback()))
+        else:
+            parent = parent.group(name=f"nested{index}")(_make_callback())
+    for index in range(cogs):
+        cog = type(f"Cog{index}", (commands.Cog,), {
+            f"command{sub_index}": command(name=f"cog{index}-{sub_index}")(
+                _make_callback(True)
+            ) for sub_index in range(cog_commands)
+        })
+        await bot.add_cog(cog())
+    if deferred:
+        from discord.ext.fslash import build_slash_commands
+        build_slash_commands()
+    seconds = perf_counter() - start
+
+    slash_commands = len(list(bot.tree.walk_commands()))
+    if not hybrid:
+        # fslashのグループコマンドは同期するまでtreeに入らないので別で数える。
+        from discord.ext.fslash import groups as groups_
+        slash_commands += sum(
+            1 + len(list(group_.walk_commands()))
+            for group_ in groups_ if group_.parent is None
+        )
+    return {
+        "seconds": seconds,
+        "commands": len(list(bot.walk_commands())),
+        "slash_commands": slash_commands
+    }
+
+
+if __name__ == "__main__":
+    print_result(run_async(run(**get_kwargs())))
@@ -2,34 +2,69 @@
 
 from __future__ import annotations
 
-from typing import Callable, Iterable, Literal, Union, Optional, Any, DefaultDict
+from typing import Callable, Iterable, Literal, NamedTuple, Union, Optional, Any, DefaultDict
 
-from asyncio import gather
+from asyncio import Semaphore, ensure_future, gather, sleep
+from contextvars import ContextVar
+from time import time
 import inspect
 
 from collections import defaultdict
-from string import octdigits
-from re import sub
+from weakref import WeakKeyDictionary, WeakSet, ref
+from functools import lru_cache
+from string import digits, whitespace
+from re import compile as compile_
 
 from discord.ext import commands
 from discord import app_commands
 import discord
 
 from .types_ import AdjustmentNameMode, ContextMode, BotT
-from .context import Context, is_fslash
+from .context import Context, OfficialContext, is_fslash
+from .registry import GroupRegistry, SlashRegistry
+from .sync import SyncStore, SyncLock, make_payload_hash
+from .cache import TTLCache
+from .plan import InvocationPlan, make_plan
+from .metrics import MetricsSink
+from .cooldown import CooldownBackend
+from .schema import ParameterSchemaCache, make_callback_hash, dump_parameters, load_parameters
+from .autocomplete import CommandTrie
+from . import metrics
 
 
 __all__ = (
-    "extend_force_slash", "is_fslash", "Context",
-    "groups", "exceptions", "adjustment_command_name"
+    "extend_force_slash", "build_slash_commands", "sync_all", "get_changed_scopes",
+    "get_skipped_scopes", "is_fslash",
+    "Context", "OfficialContext", "MetricsSink", "get_invocation_plan",
+    "groups", "slashes", "exceptions", "adjustment_command_name", "adjustment_command_names"
 )
 __version__ = "0.2.1"
 __author__ = "tasuren"
 
 
-VALID_COMMAND_NAME_CHARACTERS_WITHOUT_LETTERS = f"{octdigits}-_"
+VALID_COMMAND_NAME_CHARACTERS_WITHOUT_LETTERS = f"{digits}-_"
+_CAMEL_CASE_BOUNDARY = compile_("(?<=[a-z0-9])(?=[A-Z])|(?<=[A-Z])(?=[A-Z][a-z])")
+# スラッシュコマンドの名前に使えないASCII文字を消して、区切り文字をモードに合わせるための変換テーブルです。
+_INVALID_ASCII_CHARACTERS = "".join(
+    char for char in map(chr, range(128))
+    if not char.isalpha() and char not in VALID_COMMAND_NAME_CHARACTERS_WITHOUT_LETTERS
+        and char not in whitespace
+)
+_TRANSLATION_TABLES = {
+    mode: str.maketrans({
+        **dict.fromkeys(_INVALID_ASCII_CHARACTERS),
+        **dict.fromkeys(f"{whitespace}-_", sandwiched)
+    })
+    for mode, sandwiched in (
+        (AdjustmentNameMode.SNAKE_CASE, "_"), (AdjustmentNameMode.KEBAB_CASE, "-")
+    )
+}
+
+
+@lru_cache(maxsize=None)
 def adjustment_command_name(name: str, mode: AdjustmentNameMode) -> str:
     """Prepares the passed string into a string that can be used as the name of a slash command.
+    The result is cached, so it is cheap to call this again with the same name.
 
     Parameters
     ----------
@@ -37,17 +72,40 @@ def adjustment_command_name(name: str, mode: AdjustmentNameMode) -> str:
         Adjustment target.
     mode : AdjustmentNameMode
         It is either a snake case or a kebab case."""
-    sandwiched = "_" if mode == AdjustmentNameMode.SNAKE_CASE else "-"
-    return "".join(
-        char
-        for char in sub(
-            "(.[A-Z])", lambda x:
-                f"{x.group(1)[0]}{sandwiched}"
-                f"{x.group(1)[1]}",
-            name.lower()
-        ).lower()
-        if char in VALID_COMMAND_NAME_CHARACTERS_WITHOUT_LETTERS
-    )[:32]
+    return _CAMEL_CASE_BOUNDARY.sub(
+        "_" if mode == AdjustmentNameMode.SNAKE_CASE else "-", name
+    ).lower().translate(_TRANSLATION_TABLES[mode])[:32]
+
+
+def adjustment_command_names(
+    names: Iterable[str], mode: AdjustmentNameMode
+) -> tuple[dict[str, str], dict[str, list[str]]]:
+    """Does `adjustment_command_name` to all passed names at once and finds the names that collide.
+    Since the names of slash commands are truncated to 32 characters, different names may become the same name.  
+    You can use this to find such commands before registering them.
+
+    Parameters
+    ----------
+    names : Iterable[str]
+        Adjustment targets.  
+        Names that can collide with each other should be passed together, such as the names of the subcommands of the same group.
+    mode : AdjustmentNameMode
+        It is either a snake case or a kebab case.
+
+    Returns
+    -------
+    tuple[dict[str, str], dict[str, list[str]]]
+        The first is a dictionary whose keys are the passed names and whose values are the adjusted names.  
+        The second is a dictionary whose keys are the adjusted names that collided and whose values are the original names."""
+    adjusted, sources = {}, defaultdict(list)
+    for name in names:
+        if name not in adjusted:
+            adjusted[name] = adjustment_command_name(name, mode)
+            sources[adjusted[name]].append(name)
+    return adjusted, {
+        new_name: original_names for new_name, original_names in sources.items()
+        if len(original_names) > 1
+    }
 
 
 _bot = None
@@ -70,40 +128,266 @@ async def _make_context(
         ctx.invoked_with = None
         ctx.__fslash__ = True
         return ctx
+    elif _ctx_mode == ContextMode.OFFICIAL_LIGHT:
+        return OfficialContext(interaction, kwargs, command, bot)
     else:
         return Context(interaction, kwargs, command, bot, **other)
 
 
+async def _create_context(
+    interaction: discord.Interaction, autocomplete: bool = False
+) -> Context | commands.Context:
+    plan = _get_slash_plan(interaction.command)
+    command = None if plan is None else plan.command
+    other = _context_kwargs if plan is None else plan.context_kwargs
+    if autocomplete:
+        # 補完は入力の度に実行されるので、計測せず、応答もしないので`auto_defer`も使わない。
+        return await _make_context(interaction, {}, command, _bot, **{**other, "auto_defer": None})
+    metrics.start(interaction, interaction.command if command is None else command)
+    with metrics.stage(interaction.command if command is None else command, "context"):
+        ctx = interaction.extras["__fslash_context__"] = await _make_context(
+            interaction, {}, command, _bot, **other
+        )
+    return ctx
+
+
+async def _get_context(
+    interaction: discord.Interaction, command=None, kwargs=None
+) -> Context | commands.Context:
+    # Contextはインタラクションごとに一つだけ作り、`interaction.extras`に入れてコンバーターとコマンドで使い回す。
+    # 最初に必要になった時に作り、コマンドの情報はコマンドの実行時に入れる。
+    ctx = interaction.extras.get("__fslash_context__")
+    if ctx is None:
+        if _converter_concurrency is None:
+            ctx = await _create_context(interaction)
+        else:
+            # コンバーターが同時に実行される場合は、作っている途中のタスクを共有して一つだけ作るようにする。
+            task = interaction.extras.get("__fslash_context_task__")
+            if task is None:
+                task = interaction.extras["__fslash_context_task__"] = \
+                    ensure_future(_create_context(interaction))
+            ctx = await task
+    if command is not None:
+        ctx.command = command
+    if kwargs is not None:
+        ctx.kwargs = kwargs
+    return ctx
+
+
 # ConverterのアノテーションをTransformerに交換するようにする。
+# 作ったTransformerはアノテーションごとに使い回す。Transformerは元のアノテーションを弱参照で持つので、アノテーションが消えればこれも消える。
+_transformers: WeakKeyDictionary[Any, app_commands.Transformer] = WeakKeyDictionary()
+# Discordのモデルのコンバーターと、その代わりに使うオプションの種類とチャンネルの種類です。
+_native_model_options = False
+_MODEL_CONVERTERS: dict[type, tuple[discord.AppCommandOptionType, list[discord.ChannelType]]] = {
+    commands.MemberConverter: (discord.AppCommandOptionType.user, []),
+    commands.UserConverter: (discord.AppCommandOptionType.user, []),
+    commands.RoleConverter: (discord.AppCommandOptionType.role, []),
+    commands.GuildChannelConverter: (discord.AppCommandOptionType.channel, []),
+    **{
+        converter: (
+            discord.AppCommandOptionType.channel,
+            app_commands.transformers.CHANNEL_TO_TYPES[channel] # type: ignore
+        )
+        for converter, channel in (
+            (commands.TextChannelConverter, discord.TextChannel),
+            (commands.VoiceChannelConverter, discord.VoiceChannel),
+            (commands.StageChannelConverter, discord.StageChannel),
+            (commands.CategoryChannelConverter, discord.CategoryChannel),
+            (commands.ForumChannelConverter, discord.ForumChannel),
+            (commands.ThreadConverter, discord.Thread)
+        )
+    }
+}
+def _get_model_converter(annotation) -> Optional[type]:
+    # Discordのモデルのコンバーターか、それを継承したクラスなら元のコンバーターを返す。
+    if not _native_model_options or not inspect.isclass(annotation) \
+            or hasattr(annotation, "autocomplete"):
+        return None
+    return next(filter(_MODEL_CONVERTERS.__contains__, annotation.__mro__), None)
+
+
+def _from_resolved(base: type, value: Any) -> Any:
+    # インタラクションで解決済みのオブジェクトから、コンバーターが返すオブジェクトを取り出す。使えない場合は`None`を返す。
+    if base is commands.MemberConverter:
+        return value if isinstance(value, discord.Member) else None
+    elif base is commands.UserConverter:
+        return getattr(value, "_user", value) if isinstance(value, (discord.User, discord.Member)) else None
+    elif base is commands.RoleConverter:
+        return value if isinstance(value, discord.Role) else None
+    # チャンネルはキャッシュにあるチャンネルを使う。
+    return value.resolve() if hasattr(value, "resolve") else None
+
+
+def _make_transformer(annotation):
+    original = ref(annotation)
+    attributes = {}
+    if (base := _get_model_converter(annotation)) is not None:
+        # Discordのオプションの種類を使い、解決済みのオブジェクトをそのまま使う。
+        # `convert`が変更されている場合か、解決済みのオブジェクトが使えない場合は、IDで元のコンバーターを実行する。
+        option_type, channel_types = _MODEL_CONVERTERS[base]
+        attributes["type"] = property(lambda _: option_type)
+        attributes["channel_types"] = property(lambda _: channel_types)
+        is_original = annotation.convert is base.convert # type: ignore
+        async def convert(interaction, value):
+            if is_original and (resolved := _from_resolved(base, value)) is not None:
+                return resolved
+            return await original()().convert( # type: ignore
+                await _get_context(interaction), str(getattr(value, "id", value))
+            )
+    elif inspect.isfunction(annotation):
+        # 関数のコンバーターを実行するTransformerを作る。
+        is_coroutine = inspect.iscoroutinefunction(annotation)
+        async def convert(_, value):
+            return await original()(value) if is_coroutine else original()(value) # type: ignore
+    else:
+        async def convert(interaction, value: str):
+            return await original()().convert(await _get_context(interaction), value) # type: ignore
+    async def transform(_, interaction, value):
+        if metrics._sink is None:
+            return await convert(interaction, value)
+        plan = _get_slash_plan(interaction.command)
+        with metrics.stage(interaction.command if plan is None else plan.command, "transform"):
+            return await convert(interaction, value)
+    return app_commands.Transform[None, type(
+        "ConverterTransformer", (app_commands.Transformer,),
+        {
+            "__fslash_original_annotation__": original,
+            "transform": classmethod(transform),
+            **attributes
+        }
+    )]
+
+
+async def _return(value):
+    return value
+
+
+_converter_concurrency: Optional[int] = None
+async def _concurrent_transform_arguments(command, interaction, namespace):
+    # fslashのConverterの引数が二つ以上ある場合は、それらを同時に実行する。
+    converters = frozenset(
+        parameter.name for parameter in command._params.values()
+        if hasattr(parameter._annotation, "__fslash_original_annotation__")
+    )
+    if len(converters) < 2:
+        return await app_commands.Command._transform_arguments(command, interaction, namespace)
+
+    semaphore = Semaphore(_converter_concurrency) # type: ignore
+    async def transform(parameter, value):
+        async with semaphore:
+            return await parameter.transform(interaction, value)
+
+    values = namespace.__dict__
+    names, coroutines = [], []
+    for parameter in command._params.values():
+        try:
+            value = values[parameter.display_name]
+        except KeyError:
+            if parameter.required:
+                for coroutine in coroutines:
+                    coroutine.close()
+                raise app_commands.CommandSignatureMismatch(command) from None
+            coroutine = _return(parameter.default)
+        else:
+            coroutine = transform(parameter, value) if parameter.name in converters \
+                else parameter.transform(interaction, value)
+        names.append(parameter.name)
+        coroutines.append(coroutine)
+
+    # 全ての結果を待ってから、引数の順番で最初のエラーを送出する。
+    transformed_values = {}
+    for name, result in zip(names, await gather(*coroutines, return_exceptions=True)):
+        if isinstance(result, BaseException):
+            raise result
+        transformed_values[name] = result
+    return transformed_values
+
+
 _original_evaluate_annotation = discord.utils.evaluate_annotation
 def _new_evaluate_annotation(*args, **kwargs):
     annotation = _original_evaluate_annotation(*args, **kwargs)
-    transform = None
-    if commands.Converter in getattr(annotation, "__mro__", ()):
-        converter = annotation()
-        async def transform(_, interaction, value: str):
-            return await converter.convert(
-                await _make_context(interaction, {}, None, _bot, **_context_kwargs), value
-            )
-    if inspect.isfunction(annotation):
-        # 関数のコンバーターを実行するTransformerを作る。
-        converter = annotation
-        async def transform(_, __, value):
-            return await converter(value) \
-                if inspect.iscoroutinefunction(converter) \
-                else converter(value)
-    if transform is not None:
-        annotation = app_commands.Transform[None, type(
-            "ConverterTransformer", (app_commands.Transformer,),
-            {
-                "__fslash_original_annotation__": staticmethod(annotation),
-                "transform": classmethod(transform)
-            }
-        )]
+    if commands.Converter in getattr(annotation, "__mro__", ()) \
+            or inspect.isfunction(annotation):
+        transformer = _transformers.get(annotation)
+        if transformer is None:
+            transformer = _transformers[annotation] = _make_transformer(annotation)
+        annotation = transformer
     return annotation
 discord.utils.evaluate_annotation = _new_evaluate_annotation
 
 
+_autocomplete_cache: Optional[TTLCache] = None
+# 補完できるオプションの種類と、候補の値をその種類にする関数です。
+_AUTOCOMPLETE_TYPES: dict[discord.AppCommandOptionType, Callable[[Any], Any]] = {
+    discord.AppCommandOptionType.string: str,
+    # 小数を切り捨てないように、文字列にしてから整数にする。
+    discord.AppCommandOptionType.integer: lambda value: int(str(value)),
+    discord.AppCommandOptionType.number: float
+}
+def _to_choice(value, convert: Callable[[Any], Any]) -> Optional[app_commands.Choice]:
+    # 補完の候補をChoiceにする。値はオプションの種類に合わせ、合わせられない場合は`None`を返す。
+    if isinstance(value, app_commands.Choice):
+        return value
+    try:
+        return app_commands.Choice(name=str(value), value=convert(value))
+    except (TypeError, ValueError):
+        return None
+
+
+def _make_autocomplete(converter, name: str, option_type: discord.AppCommandOptionType):
+    # Converterの`autocomplete`を実行する補完の関数を作る。
+    # `autocomplete_cache`が設定されている場合は、コマンドと引数とギルドと入力中の文字列ごとに結果を使い回す。
+    convert = _AUTOCOMPLETE_TYPES[option_type]
+    async def autocomplete(interaction: discord.Interaction, current):
+        if _autocomplete_cache is not None:
+            key = (
+                getattr(interaction.command, "qualified_name", None), name,
+                interaction.guild_id, current
+            )
+            choices = _autocomplete_cache.get(key)
+            if choices is not None:
+                return choices
+        choices = [
+            choice for value in await converter.autocomplete(
+                await _create_context(interaction, True), current
+            ) if (choice := _to_choice(value, convert)) is not None
+        ][:25]
+        if _autocomplete_cache is not None:
+            _autocomplete_cache[key] = choices # type: ignore
+        return choices
+    return autocomplete
+
+
+def _apply_autocomplete(parameter, converter=None):
+    # Converterに`autocomplete`のクラスメソッドがある場合は、それを引数の補完に使う。
+    # `converter`が渡されていない場合は、Converterを交換したTransformerの元のアノテーションを使う。
+    if converter is None:
+        original = getattr(parameter._annotation, "__fslash_original_annotation__", None)
+        converter = original and original()
+    if parameter.autocomplete is None and parameter.type in _AUTOCOMPLETE_TYPES \
+            and inspect.iscoroutinefunction(getattr(converter, "autocomplete", None)):
+        parameter.autocomplete = _make_autocomplete(converter, parameter.name, parameter.type)
+    return parameter
+
+
+_schema_cache: Optional[ParameterSchemaCache] = None
+_original_extract = app_commands.commands._extract_parameters_from_callback # type: ignore
+def _make_cached_extract(options: Any):
+    # 引数の情報を`schema_cache`から作る。なかった場合は普通に作って保存して置く。
+    def extract(func, globalns):
+        assert _schema_cache is not None
+        key = f"{func.__module__}:{func.__qualname__}"
+        hash_ = make_callback_hash(func, options)
+        if (data := _schema_cache.get(key, hash_)) is not None:
+            return load_parameters(data, app_commands.transformers.annotation_to_parameter)
+        parameters = _original_extract(func, globalns)
+        if not _schema_cache.has(key, hash_):
+            _schema_cache.set(key, hash_, dump_parameters(func, parameters))
+        return parameters
+    return extract
+
+
 _original_atp = app_commands.transformers.annotation_to_parameter
 _original_signature = inspect.signature
 def _replace_atp(toggle: bool, _: Optional[dict] = None, riats: bool = False):
@@ -113,16 +397,16 @@ def _replace_atp(toggle: bool, _: Optional[dict] = None, riats: bool = False):
         def new_atp(annotation, parameter):
             if riats:
                 try:
-                    return _original_atp(annotation, parameter)
+                    return _apply_autocomplete(_original_atp(annotation, parameter))
                 except Exception:
                     # 失敗したなら`str`のアノテーションにする。
                     if parameter.kind in (
                         parameter.POSITIONAL_ONLY, parameter.VAR_KEYWORD, parameter.VAR_POSITIONAL
                     ):
                         parameter = parameter.replace(kind=parameter.KEYWORD_ONLY)
-                    return _original_atp(str, parameter)
+                    return _apply_autocomplete(_original_atp(str, parameter), annotation)
             else:
-                return _original_atp(annotation, parameter)
+                return _apply_autocomplete(_original_atp(annotation, parameter))
         app_commands.transformers.annotation_to_parameter = new_atp
         app_commands.commands.annotation_to_parameter = new_atp
 
@@ -139,10 +423,16 @@ def _replace_atp(toggle: bool, _: Optional[dict] = None, riats: bool = False):
                     new[-1] = parameter.replace(annotation=str)
             return signature.replace(parameters=new) if ok else signature
         inspect.signature = new_signature
+
+        if _schema_cache is not None:
+            app_commands.commands._extract_parameters_from_callback = _make_cached_extract( # type: ignore
+                (riats, discord.__version__, __version__)
+            )
     else:
         app_commands.transformers.annotation_to_parameter = _original_atp
         app_commands.commands.annotation_to_parameter = _original_atp
         inspect.signature = _original_signature
+        app_commands.commands._extract_parameters_from_callback = _original_extract # type: ignore
 
 
 def _get(command, key, default):
@@ -151,34 +441,212 @@ def _get(command, key, default):
         or command.extras.get(key, default)
 
 
+def _get_guild_ids(command) -> Optional[list[int]]:
+    # コマンドが登録されるギルドのIDを取り出します。グローバルの場合は`None`です。
+    if guild_ids := _get(command, "guild_ids", None):
+        return list(guild_ids)
+    guilds = _get(command, "guilds", None) or ()
+    if guild := _get(command, "guild", None):
+        guilds = (guild, *guilds)
+    return [getattr(guild, "id", guild) for guild in guilds] or None
+
+
 # `parse_arguments`で何も実行しないようにする。
 _original_parse_arguments = commands.Command._parse_arguments
 async def _new_parse_arguments(self, ctx):
     if is_fslash(ctx) and not getattr(ctx, "__fslash_do_original_pa__", False):
-        ctx.args = (ctx.command.cog, ctx) if ctx.command.cog else (ctx,)
+        plan: Optional[InvocationPlan] = getattr(self, "__fslash_plan__", None)
+        if plan is None:
+            ctx.args = (ctx.command.cog, ctx) if ctx.command.cog else (ctx,)
+        else:
+            ctx.args = plan.make_args(ctx)
     else:
         return await _original_parse_arguments(self, ctx)
 setattr(commands.Command, "_parse_arguments", _new_parse_arguments)
 
 
-async def _run_command(bot, interaction, command, content, kwargs={}) -> None:
+_check_cache: Optional[TTLCache] = None
+async def _run_check(predicate, ctx) -> bool:
+    # チェックを実行する。`check_cache`が設定されている場合は、同じコマンドとユーザーとギルドとチャンネルでの結果を使い回す。
+    # Botのチェックや`cog_check`は`ctx.command`で処理を変えることがあるので、コマンドもキーに入れる。
+    if _check_cache is None:
+        return await discord.utils.maybe_coroutine(predicate, ctx)
+    key = (
+        predicate, getattr(ctx.command, "qualified_name", None), ctx.author.id,
+        getattr(ctx.guild, "id", None), getattr(ctx.channel, "id", None)
+    )
+    result = _check_cache.get(key)
+    if result is None:
+        try:
+            result = bool(await discord.utils.maybe_coroutine(predicate, ctx))
+        except commands.CheckFailure as e:
+            result = e
+        _check_cache[key] = result
+    if isinstance(result, commands.CheckFailure):
+        raise result.with_traceback(None)
+    return result
+
+
+async def _run_checks(predicates, ctx) -> bool:
+    # チェックを順番に実行して、失敗した時点で止める。
+    for predicate in predicates:
+        if not await _run_check(predicate, ctx):
+            return False
+    return True
+
+
+async def _run_bot_checks(bot, ctx, call_once: bool) -> bool:
+    # Botのチェックを実行する。`Bot.can_run`が上書きされている場合か`check_cache`がない場合は、`Bot.can_run`を使う。
+    if _check_cache is None or getattr(bot.can_run, "__func__", None) \
+            is not commands.bot.BotBase.can_run:
+        return await bot.can_run(ctx, call_once=call_once)
+    return await _run_checks(bot._check_once if call_once else bot._checks, ctx)
+
+
+# fslashのContextの場合は、`check_cache`を使ってチェックをするようにする。
+_original_can_run = commands.Command.can_run
+async def _new_can_run(self, ctx, /):
+    if _check_cache is None or not is_fslash(ctx):
+        return await _original_can_run(self, ctx)
+    # ここは`commands.Command.can_run`と同じ処理です。
+    if not self.enabled:
+        raise commands.DisabledCommand(f"{self.name} command is disabled")
+    original, ctx.command = ctx.command, self
+    try:
+        if not await _run_bot_checks(ctx.bot, ctx, False):
+            raise commands.CheckFailure(
+                f"The global check functions for command {self.qualified_name} failed."
+            )
+        if self.cog is not None:
+            local_check = commands.Cog._get_overridden_method(self.cog.cog_check)
+            if local_check is not None and not await _run_check(local_check, ctx):
+                return False
+        return await _run_checks(self.checks, ctx)
+    finally:
+        ctx.command = original
+setattr(commands.Command, "can_run", _new_can_run)
+
+
+async def _can_run(bot, plan: InvocationPlan, ctx) -> bool:
+    # Botのチェック、親コマンドのチェック、コマンドのチェックの順に実行して、失敗した時点で止める。
+    if not await _run_bot_checks(bot, ctx, True):
+        return False
+    for parent in plan.parents:
+        if not await parent.can_run(ctx):
+            return False
+    return await plan.command.can_run(ctx)
+
+
+async def _run_command(
+    bot, interaction, plan: Optional[InvocationPlan], content, kwargs={}
+) -> None:
     # Run command
-    ctx = await _make_context(interaction, kwargs, command, bot, **_context_kwargs)
+    if plan is None:
+        # 元のコマンドが削除されて、登録が解除されたスラッシュコマンドが実行された場合です。
+        *parents, name = interaction.command.qualified_name.split()
+        raise app_commands.CommandNotFound(name, parents)
+    command = plan.command
+    ctx = await _get_context(interaction, command, kwargs)
     if content is not None:
         ctx.view = type(ctx.view)(content)
         setattr(ctx, "__fslash_do_original_pa__", True)
+        metrics.increment(command, "nested_fallback")
     try:
-        if await bot.can_run(ctx, call_once=True) and (
-            command.parent is None or all(await gather(*(
-                parent.can_run(ctx)
-                for parent in command.parents
-            )))
-        ) and await command.can_run(ctx):
-            await command.invoke(ctx) # type: ignore
+        with metrics.stage(command, "checks"):
+            can_run = await _can_run(bot, plan, ctx)
+        if can_run:
+            with metrics.stage(command, "invoke"):
+                await command.invoke(ctx) # type: ignore
+        else:
+            metrics.increment(command, "check_failure")
     except commands.CommandError as e:
+        metrics.increment(
+            command, "check_failure" if isinstance(e, commands.CheckFailure) else "error"
+        )
         await command.dispatch_error(ctx, e)
     else:
         bot.dispatch("command_completion", ctx)
+    # 溜めていた応答があれば、コマンドの実行が終わった時に送る。
+    if getattr(ctx, "buffer_responses", False):
+        await ctx.flush() # type: ignore
+
+
+class _SlashCommand(app_commands.Command):
+    # fslashが作ったスラッシュコマンドのクラスです。作ったスラッシュコマンドのクラスをこれに変える。
+    async def _invoke_with_namespace(self, interaction, namespace):
+        try:
+            return await super()._invoke_with_namespace(interaction, namespace)
+        finally:
+            # 応答しないで終わった場合や、引数の変換やチェックで失敗した場合に、後から自動で`defer`をしないようにする。
+            ctx = interaction.extras.get("__fslash_context__")
+            if isinstance(ctx, Context):
+                ctx._cancel_auto_defer()
+
+    async def _transform_arguments(self, interaction, namespace):
+        if _converter_concurrency is None:
+            return await super()._transform_arguments(interaction, namespace)
+        return await _concurrent_transform_arguments(self, interaction, namespace)
+
+
+def get_invocation_plan(
+    command: Union[commands.Command, commands.Group]
+) -> Optional[InvocationPlan]:
+    """Gets the plan used to run the command by a slash.
+    It is useful for debugging.
+
+    Parameters
+    ----------
+    command : Union[discord.ext.commands.Command, discord.ext.commands.Group]
+
+    Returns
+    -------
+    plan.InvocationPlan, optional
+        If the command has not been registered as a slash, `None` is returned."""
+    return getattr(command, "__fslash_plan__", None)
+
+
+def _add_nested_path(command) -> None:
+    # Nestしすぎたグループコマンドのサブコマンドのパスを、`content`で受け取るコマンドのトライ木に追加する。
+    names = [command.name]
+    for parent in command.parents:
+        trie: Optional[CommandTrie] = getattr(parent, "__fslash_nested_trie__", None)
+        if trie is not None:
+            trie.insert(" ".join(reversed(names)), command.signature)
+            return
+        names.append(parent.name)
+
+
+def _get_slash_plan(slash) -> Optional[InvocationPlan]:
+    # スラッシュコマンドの元のコマンドの実行計画を取り出す。
+    command = slashes.get_command(slash)
+    return None if command is None else getattr(command, "__fslash_plan__", None)
+
+
+def _make_fingerprint(command) -> tuple:
+    # 再読み込みの前後でスラッシュコマンドが変わったかを比べるための値を作る。
+    # チェックはスラッシュコマンドに含まれず、実行計画は毎回作り直されるので含めない。
+    return (
+        type(command), command.qualified_name, command.description,
+        tuple(command.clean_params.values()), _get_guild_ids(command),
+        _get(command, "fsparent", None), tuple(
+            item for item in vars(command.callback).items()
+            if item[0].startswith("__discord_app_commands")
+        )
+    )
+
+
+class _Stashed(NamedTuple):
+    command: commands.Command
+    slash: Union[app_commands.Command, app_commands.Group]
+    fingerprint: tuple
+    scopes: list[Optional[int]]
+
+
+def _get_scopes(command, parent: Optional[app_commands.Group]) -> list[Optional[int]]:
+    # スラッシュコマンドが登録されるギルドのIDを取り出す。グローバルの場合は`None`です。
+    if parent is None:
+        return _get_guild_ids(command) or [None]
+    return list((parent.root_parent or parent)._guild_ids or (None,))
 
 
 def _apply_describe(command):
@@ -190,52 +658,183 @@ def _apply_describe(command):
         setattr(command.callback, name, value)
 
 
+def _compile_choices(
+    choices: dict[str, list[app_commands.Choice]]
+) -> dict[str, tuple[Any, dict[str, app_commands.Choice]]]:
+    # 引数ごとに、Choiceの代わりに使うLiteralと名前からChoiceを取り出すための辞書を作って置く。
+    compiled = {}
+    for name, param_choices in choices.items():
+        lookup = {}
+        for choice in param_choices:
+            lookup.setdefault(choice.name, choice)
+        compiled[name] = (Literal[tuple(lookup)], lookup)
+    return compiled
+
+
+# `cooldown_backend`が設定されている場合は、スラッシュで実行されたコマンドのクールダウンと同時実行数をそれで管理する。
+_cooldown_backend: Optional[CooldownBackend] = None
+async def _prepare_cooldowns(command, ctx) -> None:
+    # discord.pyの`_prepare_cooldowns`と同じだが、トークンはバックエンドから取る。
+    if command._buckets.valid:
+        current = time()
+        bucket = command._buckets.get_bucket(ctx, current)
+        if bucket is not None:
+            retry_after = await _cooldown_backend.update_rate_limit( # type: ignore
+                f"{command.qualified_name}:{command._buckets._bucket_key(ctx)}",
+                bucket.rate, bucket.per, current
+            )
+            if retry_after:
+                raise commands.CommandOnCooldown(bucket, retry_after, command._buckets.type)
+
+
+# discord.pyの`_prepare_cooldowns`は同期関数なので、バックエンドを待てない。
+# そこでfslashのContextの場合は印だけ付けて置き、`prepare`がその後に実行する`call_before_hooks`の前にバックエンドからトークンを取る。
+_original_prepare_cooldowns = commands.Command._prepare_cooldowns
+def _new_prepare_cooldowns(self, ctx, /):
+    if not is_fslash(ctx):
+        return _original_prepare_cooldowns(self, ctx)
+    setattr(ctx, "__fslash_cooldown__", self)
+
+
+_original_call_before_hooks = commands.Command.call_before_hooks
+async def _new_call_before_hooks(self, ctx, /):
+    if getattr(ctx, "__fslash_cooldown__", None) is self:
+        setattr(ctx, "__fslash_cooldown__", None)
+        await _prepare_cooldowns(self, ctx)
+    return await _original_call_before_hooks(self, ctx)
+
+
+# discord.pyはコマンドの実行後に`ctx.message`で解放するので、バックエンドが返したものはそのオブジェクトで取り出せるようにして置く。
+_concurrency_tokens: dict[tuple[int, int], tuple[str, Any]] = {}
+_original_acquire = commands.MaxConcurrency.acquire
+async def _new_acquire(self, message):
+    if not is_fslash(message):
+        return await _original_acquire(self, message)
+    key = f"{message.command.qualified_name}:{self.get_key(message)}"
+    while (token := await _cooldown_backend.acquire(key, self.number)) is None:
+        if not self.wait:
+            raise commands.MaxConcurrencyReached(self.number, self.per)
+        await sleep(_cooldown_backend.poll_interval)
+    _concurrency_tokens[(id(self), id(message.message))] = (key, token)
+
+
+_original_release = commands.MaxConcurrency.release
+async def _new_release(self, message):
+    acquired = _concurrency_tokens.pop(
+        (id(self), id(message.message if is_fslash(message) else message)), None
+    )
+    if acquired is None:
+        return await _original_release(self, message)
+    await _cooldown_backend.release(*acquired) # type: ignore
+
+
 _original_run_converter = commands.core.run_converters # type: ignore
 async def _new_run_converters(ctx, converter, argument, param):
-    origin = getattr(converter, "__origin__", None)
-    is_choice = False
-    if origin is app_commands.Choice and hasattr(
-        ctx.command.callback, "__fslash_param_choices__"
+    if getattr(converter, "__origin__", None) is app_commands.Choice and (
+        choices := getattr(ctx.command.callback, "__fslash_param_choices__", {}).get(param.name)
     ):
-        # ChoiceをLiteralに交換する。
-        if choices := ctx.command.callback.__fslash_param_choices__.get(param.name):
-            converter = Literal[0]
-            setattr(converter, "__args__", tuple(choice.name for choice in choices))
-            is_choice = True
+        # ChoiceをLiteralに交換して、その結果の名前からChoiceを取り出す。
+        return choices[1][await _original_run_converter(ctx, choices[0], argument, param)]
     elif hasattr(converter, "__fslash_original_annotation__"):
         # TransformはConverterに置き換える。
-        converter = getattr(converter, "__fslash_original_annotation__")
-    data = await _original_run_converter(ctx, converter, argument, param)
-    if is_choice:
-        data = discord.utils.get(choices, name=data)
-    return data
+        converter = getattr(converter, "__fslash_original_annotation__")()
+    return await _original_run_converter(ctx, converter, argument, param)
 commands.core.run_converters = _new_run_converters # type: ignore
 
 
-def _append_command(
-    cog: commands.Cog | None, command: discord.app_commands.Command, parent: bool
-):
-    if cog is not None:
-        if parent:
-            if not hasattr(cog, "__fslash_app_parent_commands__"):
-                setattr(cog, "__fslash_app_parent_commands__", [])
-            getattr(cog, "__fslash_app_parent_commands__").append(command)
-        else:
-            if not hasattr(cog, "__fslash_app_commands__"):
-                setattr(cog, "__fslash_app_commands__", [])
-            if not hasattr(cog, "__fslash_app_groups__"):
-                setattr(cog, "__fslash_app_groups__", [])
-            if isinstance(command, discord.app_commands.Group):
-                getattr(cog, "__fslash_app_groups__").append(command)
-            else:
-                getattr(cog, "__fslash_app_commands__").append(command)
-
-
-groups = []
-"List containing group commands scheduled to be registered with a slash."
+groups = GroupRegistry()
+"Group commands scheduled to be registered with a slash. It is indexed by the name and the guild scope."
 exceptions: DefaultDict[str, dict[Any, Exception]] = defaultdict(dict)
 "This dictionary is used to include errors when something failed but did not output an error."
+slashes = SlashRegistry()
+"The slash commands made from the command framework commands. They can be looked up from each other."
+_guild_scopes: set[Optional[int]] = set()
+_changed_scopes: set[Optional[int]] = set()
+_skipped_scopes: set[Optional[int]] = set()
+# `sync_all`の`force`を、パッチした`CommandTree.sync`に引数を増やさずに渡す。
+_forcing_sync: ContextVar[bool] = ContextVar("fslash_forcing_sync", default=False)
+# 拡張機能の再読み込み中に、元のコマンドのスラッシュコマンドを修飾名ごとに取って置く。
+_reloading: Optional[dict[str, _Stashed]] = None
+def get_changed_scopes() -> set[Optional[int]]:
+    """Gets the guild scopes whose slash commands have changed since they were last synced.
+    After an extension is reloaded, only the scopes of the slash commands that were changed by it are added.
+
+    Returns
+    -------
+    set[Optional[int]]
+        The guild IDs. `None` is global."""
+    return set(_changed_scopes)
+
+
+def get_skipped_scopes() -> set[Optional[int]]:
+    """Gets the guild scopes whose last `CommandTree.sync` did not upload the commands because the hash saved to `sync_store` was the same.
+
+    Returns
+    -------
+    set[Optional[int]]
+        The guild IDs. `None` is global."""
+    return set(_skipped_scopes)
+
+
+async def sync_all(
+    *, concurrency: int = 10, include_global: bool = True, only_changed: bool = False,
+    force: bool = False
+) -> dict[Optional[int], Union[list[app_commands.AppCommand], Exception]]:
+    """Syncs all guild scopes that the commands registered by fslash belong to concurrently.
+    Commands with `guild`, `guilds` or `guild_ids` are spread over many guild scopes, so this is useful instead of calling `CommandTree.sync` for each guild.  
+    The rate limits are handled by the HTTP client of discord.py, because each guild has its own rate limit for the sync.
+
+    Parameters
+    ----------
+    concurrency : int, default 10
+        The maximum number of syncs that run at the same time.
+    include_global : bool, default True
+        Whether to sync the global commands too.
+    only_changed : bool, default False
+        Whether to sync only the guild scopes returned by `get_changed_scopes`.  
+        This is useful after reloading an extension, because unchanged commands are not rebuilt.
+    force : bool, default False
+        Whether to sync even if the hash saved to `sync_store` of `extend_force_slash` is the same.  
+        Use this when the commands on Discord have been changed by something else.
+
+    Returns
+    -------
+    dict[Optional[int], Union[list[discord.app_commands.AppCommand], Exception]]
+        The keys are the guild IDs (`None` is global) and the values are the synced commands.  
+        If a sync fails, the value is the error instead."""
+    assert _bot is not None, "`extend_force_slash` has not been called yet."
+    semaphore = Semaphore(concurrency)
+    async def sync(guild_id: Optional[int]):
+        async with semaphore:
+            try:
+                return await _bot.tree.sync( # type: ignore
+                    guild=None if guild_id is None else discord.Object(guild_id)
+                )
+            except Exception as e:
+                return e
+    scopes = [
+        scope for scope in _guild_scopes
+        if (include_global or scope is not None)
+            and (not only_changed or scope in _changed_scopes)
+    ]
+    token = _forcing_sync.set(force)
+    try:
+        return dict(zip(scopes, await gather(*map(sync, scopes))))
+    finally:
+        _forcing_sync.reset(token)
+
+
 __patched = False
+_build_slash_commands: Optional[Callable[[], None]] = None
+def build_slash_commands() -> None:
+    """Registers the commands recorded in the deferred registration mode as slashes at once.
+    It is called automatically after `setup_hook` of the bot or before the first `CommandTree.sync`, so you usually do not need to call it.
+    Once it has been called, commands made after that are registered immediately.  
+    If the deferred registration mode is not used or it has already been called, it does nothing."""
+    if _build_slash_commands is not None:
+        _build_slash_commands()
+
+
 def extend_force_slash(
     bot: BotT, *,
     check: Optional[Callable[[Union[commands.Command, commands.Group]], bool]] = None,
@@ -244,7 +843,17 @@ def extend_force_slash(
     default_description: str = "...",
     first_groups: Optional[Iterable[app_commands.Group]] = None,
     context_mode: ContextMode = ContextMode.OFFICIAL,
-    context_kwargs: Optional[dict] = None
+    context_kwargs: Optional[dict] = None,
+    deferred_registration: bool = False,
+    sync_store: Optional[SyncStore] = None,
+    sync_lock: Optional[SyncLock] = None,
+    check_cache: Optional[TTLCache] = None,
+    autocomplete_cache: Optional[TTLCache] = None,
+    metrics_sink: Optional[MetricsSink] = None,
+    converter_concurrency: Optional[int] = None,
+    native_model_options: bool = False,
+    cooldown_backend: Optional[CooldownBackend] = None,
+    schema_cache: Optional[ParameterSchemaCache] = None
 ) -> BotT:
     """This class forces commands in the command framework bot to be registered even if they are slash commands.
 
@@ -273,7 +882,59 @@ def extend_force_slash(
         How to make `ctx`.
     context_kwargs : dict, optional
         Keyword arguments to be passed to the arguments after `typing_mode` of `fslash.context.Context`.  
-        Detail is here: `Context`
+        Detail is here: `Context`  
+        It can be overridden for each command by passing `context_kwargs` to the command framework command or its `extras`.
+    deferred_registration : bool, default False
+        Whether to register the commands as slashes at once instead of registering them each time a command is made.  
+        If this is `True`, the commands made after this function is called are registered after `setup_hook` of the bot, before the first `CommandTree.sync` or when `build_slash_commands` is called.  
+        This makes the startup of a bot with many commands faster, because the patching needed for the registration is done only once and commands removed before that are skipped.  
+        Commands that are not added to the bot at that time are not registered.
+    sync_store : sync.SyncStore, optional
+        The store used to skip `CommandTree.sync` when the commands have not changed since the last sync.  
+        When this is passed, the hash of the payload of each guild scope is saved to it after a sync, and the next sync with the same hash does not upload the commands.  
+        Such a sync returns the commands synced last time, or the commands fetched from Discord, and its scope is returned by `get_skipped_scopes`.  
+        When the commands on Discord have been changed by something else, use `sync_all(force=True)` to sync them anyway.  
+        `sync.FileSyncStore` saves the hashes to a local file.
+    sync_lock : sync.SyncLock, optional
+        The lock used to let only one process sync the commands when the same bot runs as several processes, such as clusters of `AutoShardedBot`.  
+        It must be passed with `sync_store` that is shared by the processes.  
+        The first process that gets the lock of a guild scope syncs it, and the other processes wait for it and then skip the sync because the hash has been saved.  
+        `sync.FileSyncLock` uses the locks of the OS on local files, so it works between the processes on the same machine.
+    check_cache : cache.TTLCache, optional
+        The cache used to reuse the results of the checks when a command is run by a slash.  
+        The results are cached for each check, command, user, guild and channel until they expire.  
+        Use this only if the checks depend only on them, such as `commands.has_guild_permissions`.  
+        If `Bot.can_run` is overridden, the checks of the bot are run by it and are not cached.
+    autocomplete_cache : cache.TTLCache, optional
+        The cache of the results of `autocomplete` of the converters.  
+        The results are cached for each command, argument, guild and input until they expire, so the same input does not run `autocomplete` again.  
+        If this is not passed, `autocomplete` is run each time.  
+        How to make `autocomplete` is described in the Notes of this function.
+    metrics_sink : metrics.MetricsSink, optional
+        The sink that receives the time taken by each stage of the commands run by a slash and the counters of failures.  
+        The stages and the counters are listed in `metrics.STAGES` and `metrics.COUNTERS`.  
+        `metrics.MemoryMetricsSink` keeps them in memory and can give p50 and p99 of each command.  
+        If this is not passed, nothing is measured.
+    converter_concurrency : int, optional
+        The maximum number of converters of a slash command that run at the same time.  
+        When this is passed and a slash command has two or more arguments with converters, such as a converter that uses a database, they are run concurrently, so the command waits only for the slowest one.  
+        The results are passed in the order of the arguments, and if some converters fail, the error of the first argument is raised.  
+        If this is not passed, the converters are run one by one.
+    native_model_options : bool, default False
+        Whether to make the arguments with the converters of Discord models, such as `commands.MemberConverter`, `commands.RoleConverter` and `commands.TextChannelConverter`, the options of the user, the role or the channel instead of strings.  
+        Then the objects resolved by Discord are used without running the converters, so they do not fetch them over HTTP.  
+        Subclasses of them are also made so, but if they override `convert`, it is run with the ID of the object.  
+        Note that the type of the options changes, so the commands need to be synced again.
+    cooldown_backend : cooldown.CooldownBackend, optional
+        The storage of the cooldowns and `max_concurrency` of the commands run by a slash.  
+        When the same bot runs as several processes, the cooldowns of discord.py are kept in each process, so a user can run a command as many times as the number of the processes.  
+        `cooldown.SQLiteCooldownBackend` shares them between the processes on the same machine with a SQLite file, leasing several tokens at once so as not to touch the file each time.  
+        If this is not passed, the cooldowns of discord.py are used as usual.
+    schema_cache : schema.ParameterSchemaCache, optional
+        The cache of the parameters of the slash commands saved to a local file.  
+        When this is passed, the parameters made from the callbacks are saved to the file after `setup_hook` of the bot, and they are made from the file instead of inspecting the callbacks on the next startup.  
+        The parameters of a callback are made again when its code, annotations, defaults, docstring or decorators change.  
+        This makes the startup of a bot with many commands faster.
 
     Warnings
     --------
@@ -287,11 +948,24 @@ def extend_force_slash(
     One may wonder if decorators such as `app_commands.describe` can be used, but of course they can.  
     Also, the command framework checks work.  
     The converter is automatically replaced by `app_commands.Transformer`.  
+    If the converter has the class method `autocomplete`, it is used for the autocomplete of the argument.  
+    It is also used when the annotation is replaced by `str` with `replace_invalid_annotation_to_str`.  
+    It takes `ctx` and the current input, and returns up to 25 `app_commands.Choice` or strings.  
+    ```python
+    class TagConverter(commands.Converter):
+        async def convert(self, ctx, argument):
+            ...
+
+        @classmethod
+        async def autocomplete(cls, ctx, current):
+            return [tag.name for tag in await search_tags(ctx.guild.id, current)]
+    ```
     Cooldown also works.  
     However, the decorator must be placed below `command`.  
     If you have a lot of nested commands like group command of group command of group command... you can't register them in the slash as they should be.  
     If such a command is encountered, it will take the subcommands after the unregistrable subcommand as arguments.  
-    Example: `/group level1 level2 content: level3 level4 ...`
+    Example: `/group level1 level2 content: level3 level4 ...`  
+    The paths of such subcommands are suggested by the autocomplete of `content`.
 
     The number of slash commands registered may exceed the maximum number of slash commands registered as commands in the command framework.  
     In that case, use the `first_groups` argument.  
@@ -327,93 +1001,119 @@ def extend_force_slash(
     You can change which methods return interaction responses and how `Context.typing` behaves by passing a value to `Context` with the `context_kwargs` argument.
     Also, `discord.app_commands.Choice` is replaced by `Literal` in the command framework commands.  
     But the value of the argument at runtime is the value of `Choice`."""
-    global _bot, groups, exceptions, _context_kwargs, _ctx_mode
+    global _bot, groups, exceptions, _context_kwargs, _ctx_mode, _build_slash_commands, \
+        _check_cache, _autocomplete_cache, _schema_cache, _converter_concurrency, \
+        _native_model_options, _cooldown_backend
     _ctx_mode = context_mode
     _context_kwargs.update(context_kwargs or {})
+    _check_cache = check_cache
+    _autocomplete_cache = autocomplete_cache
+    _schema_cache = schema_cache
+    _native_model_options = native_model_options
+    if cooldown_backend is not None:
+        # 他のBotに影響しないように、`cooldown_backend`が渡された場合だけ置き換える。
+        _cooldown_backend = cooldown_backend
+        commands.Command._prepare_cooldowns = _new_prepare_cooldowns
+        commands.Command.call_before_hooks = _new_call_before_hooks
+        commands.MaxConcurrency.acquire = _new_acquire
+        commands.MaxConcurrency.release = _new_release
+    _converter_concurrency = converter_concurrency
+    metrics._sink = metrics_sink
     _bot = bot
     if first_groups is not None:
         for g in first_groups:
             groups.append(g)
+            _guild_scopes.update(g._guild_ids or (None,))
 
     global __patched
     assert not __patched, "This can only be called once."
+    assert sync_lock is None or sync_store is not None, "`sync_lock` needs `sync_store`."
     __patched = True
     if check is None: check = lambda _: True
 
-    # コマンドが作られた際にそのコマンドを呼び出すコマンドをtreeに登録する。
-    original_command_init = commands.Command.__init__
-    def command_new_init(command: commands.Command, func, /, **kwargs):
-        if not (cog_mode := kwargs.pop("__cog_mode__", False)):
-            original_command_init(command, func, **kwargs)
-        cog = kwargs.pop("__cog__", None)
-
-        # コグに実装されているコマンドの場合は、コグが追加された後にスラッシュとして登録する。
-        # 理由は内部でコピーを行うためここが(多分)二回呼ばれてしまうためで、それを対策しようとするととてもめんどくさいことになってしまうから。
-        if command.callback.__code__.co_varnames[0] == "self" and not cog_mode:
-            if not isinstance(command, commands.Group):
-                _apply_describe(command)
+    # スラッシュコマンドの登録が解除された時か、元のコマンドが消された時に、スラッシュコマンドも削除する。
+    def remove_slash(slash: Union[app_commands.Command, app_commands.Group]):
+        if isinstance(slash, app_commands.Group):
+            groups.remove(slash)
+        if slash.parent is not None:
+            slash.parent.remove_command(slash.name)
+            _changed_scopes.update((slash.root_parent or slash.parent)._guild_ids or (None,))
             return
+        for guild_id in (None, *bot.tree._guild_commands): # type: ignore
+            guild = None if guild_id is None else discord.Object(guild_id)
+            if bot.tree.get_command(slash.name, guild=guild) is slash: # type: ignore
+                bot.tree.remove_command(slash.name, guild=guild) # type: ignore
+                _changed_scopes.add(guild_id)
 
+    # コマンドをスラッシュとして登録する。これは`_replace_atp`で置き換えた状態で実行しなければならない。
+    def register_command(command: commands.Command, cog: commands.Cog | None):
         # もしNestしすぎたグループコマンドのコマンドの場合はパスする。この`__fslash_*_*__`は下で作られます。
         if command.parent is not None and getattr(
             command.parent, "__fslash_max_parent__", False
         ):
             setattr(command, "__fslash_max_parent__", True)
+            _add_nested_path(command)
             return
 
         # コマンドを実装するかのチェックをする。
         if not check(command): return
 
-        _replace_atp(
-            True, exceptions["replace_invalid_annotation_to_str"],
-            replace_invalid_annotation_to_str
-        )
-
         # もし親のグループが指定されているのならそれを探し出す。
         parent = None
         fsparent = _get(command, "fsparent", None)
-        for group in groups:
-            if fsparent == group.name:
-                parent = group
-                break
-        else:
-            assert fsparent is None, f"A group command that has not yet been registered as a parent command in `{command}` has been specified."
+        if fsparent is not None:
+            parent = groups.get(fsparent, _get_guild_ids(command))
+            assert parent is not None, f"A group command that has not yet been registered as a parent command in `{command}` has been specified."
         # もしコマンドフレームワークのグループコマンドのサブコマンドの場合は、親コマンドのスラッシュのグループコマンドを、スラッシュでも親コマンドとする。
         if parent is None and command.parent is not None:
-            parent = getattr(command.parent, "__fslash__", None)
+            parent = slashes.get_slash(command.parent)
             if parent is None:
-                return _replace_atp(False, None, replace_invalid_annotation_to_str)
+                return
         # choiceのデータをコマンドフレームワークのコマンド実行時にLiteralに交換するので取って置く。
         if hasattr(command.callback, "__discord_app_commands_param_choices__"):
             setattr(
                 command._callback, "__fslash_param_choices__",
-                getattr(
-                    command.callback, "__discord_app_commands_param_choices__", None
-                ).copy() # type: ignore
+                _compile_choices(getattr(
+                    command.callback, "__discord_app_commands_param_choices__"
+                ))
             )
         # スラッシュコマンドを作る。
         name = command.name if adjustment_name is None \
             else adjustment_command_name(command.name, adjustment_name)
         if getattr(parent, "__fslash_max_parent__", False):
-            return _replace_atp(False, None, replace_invalid_annotation_to_str)
+            return
         is_group = isinstance(command, commands.Group)
+        # スラッシュで実行する時に必要なものをここで用意して置く。
+        setattr(command, "__fslash_plan__", make_plan(command, cog, {
+            **_context_kwargs, **(_get(command, "context_kwargs", None) or {})
+        }))
+        # 拡張機能の再読み込み中で、元のコマンドから変わっていない場合はスラッシュコマンドを使い回す。
+        stashed = None if _reloading is None else _reloading.pop(command.qualified_name, None)
+        if stashed is not None:
+            if stashed.fingerprint == _make_fingerprint(command) \
+                    and stashed.slash.parent is parent \
+                    and not hasattr(stashed.command, "__fslash_nested_trie__"):
+                slashes.register(command, stashed.slash)
+                if parent is None and isinstance(stashed.slash, app_commands.Command):
+                    # discord.pyは拡張機能の再読み込み時にそのモジュールのスラッシュコマンドをtreeから削除するので、追加し直す。
+                    guild_ids = _get_guild_ids(command)
+                    bot.tree.add_command(stashed.slash, guilds=[ # type: ignore
+                        discord.Object(guild_id) for guild_id in guild_ids
+                    ] if guild_ids else discord.utils.MISSING, override=True)
+                return
+            remove_slash(stashed.slash)
+        _changed_scopes.update(_get_scopes(command, parent))
         try:
             assert parent is None or len(parent._children) < 24
             if is_group:
-                for index, group in enumerate(groups):
-                    if group.name == name:
-                        del groups[index]
-                        break
                 groups.append(group := app_commands.Group(
                     name=name,
                     description=command.description or default_description,
                     parent=parent, guild_ids=_get(command, "guild_ids", None)
                 ))
-                setattr(command, "__fslash__", group)
+                slashes.register(command, group)
                 if parent is None:
-                    _append_command(cog, group, False)
-                elif fsparent is not None:
-                    _append_command(cog, group, True)
+                    _guild_scopes.update(group._guild_ids or (None,))
             else:
                 _apply_describe(command)
                 # スラッシュコマンドを作る。
@@ -425,17 +1125,17 @@ def extend_force_slash(
                         )
                     ) if parent is None else {})
                 )(command.callback) # type: ignore
-                setattr(command, "__fslash__", app_command)
+                app_command.__class__ = _SlashCommand
+                slashes.register(command, app_command)
 
-                # 実行される関数を用意する。
+                # 実行される関数を用意する。スラッシュコマンドがコマンドを生かし続けないように、コマンドは登録簿から取り出す。
+                # 再読み込みでスラッシュコマンドが使い回された場合は、新しいコマンドが取り出される。
                 async def inner_function(interaction: discord.Interaction, **kwargs): # type: ignore
-                    await _run_command(bot, interaction, command, None, kwargs)
+                    await _run_command(bot, interaction, _get_slash_plan(app_command), None, kwargs)
                 setattr(app_command, "_callback", inner_function)
 
                 if parent is None:
-                    _append_command(cog, app_command, False)
-                elif fsparent is not None:
-                    _append_command(cog, app_command, True)
+                    _guild_scopes.update(_get_guild_ids(command) or (None,))
         except (ValueError, AssertionError) as e:
             # もしNestしすぎたグループコマンドがある場合は、コマンドの文を受け取るコマンドを代わりに作る。
             assert isinstance(parent, app_commands.Group)
@@ -445,14 +1145,81 @@ def extend_force_slash(
             async def alternative_for_nested(
                 interaction: discord.Interaction, content: str
             ):
-                await _run_command(bot, interaction, command, content)
+                await _run_command(
+                    bot, interaction, _get_slash_plan(alternative_for_nested), content
+                )
+            alternative_for_nested.__class__ = _SlashCommand
+            slashes.register(command, alternative_for_nested)
+            # `content`でサブコマンドのパスを補完できるようにする。パスはサブコマンドが作られた時にトライ木に追加される。
+            setattr(command, "__fslash_nested_trie__", trie := CommandTrie())
+            @alternative_for_nested.autocomplete("content")
+            async def complete_content(_, current: str):
+                return trie.search(current)
             setattr(command, "__fslash_max_parent__", True)
             if isinstance(e, AssertionError):
                 setattr(parent, "__fslash_max_parent__", True)
 
-        _replace_atp(False, None, replace_invalid_annotation_to_str)
+    # コマンドが作られた際にそのコマンドを呼び出すコマンドをtreeに登録する。
+    original_command_init = commands.Command.__init__
+    def command_new_init(command: commands.Command, func, /, **kwargs):
+        if not (cog_mode := kwargs.pop("__cog_mode__", False)):
+            original_command_init(command, func, **kwargs)
+        cog = kwargs.pop("__cog__", None)
+
+        # コグに実装されているコマンドの場合は、コグが追加された後にスラッシュとして登録する。
+        # 理由は内部でコピーを行うためここが(多分)二回呼ばれてしまうためで、それを対策しようとするととてもめんどくさいことになってしまうから。
+        if command.callback.__code__.co_varnames[0] == "self" and not cog_mode:
+            if not isinstance(command, commands.Group):
+                _apply_describe(command)
+            return
+
+        # 遅延登録モードの場合は、まとめて登録する時まで記録して置くだけにする。
+        if deferred_registration and _build_slash_commands is not None:
+            deferred_commands.add(command)
+            return
+
+        _replace_atp(
+            True, exceptions["replace_invalid_annotation_to_str"],
+            replace_invalid_annotation_to_str
+        )
+        try:
+            register_command(command, cog)
+        finally:
+            _replace_atp(False, None, replace_invalid_annotation_to_str)
     setattr(commands.Command, "__init__", command_new_init)
 
+    # 遅延登録モードで記録したコマンドです。`extend_force_slash`の前に作られたコマンドは含まない。
+    deferred_commands: WeakSet[commands.Command] = WeakSet()
+    if deferred_registration:
+        # 遅延登録モードの場合は、記録したコマンドのうちBotにあるものを親から順番にまとめて登録する。
+        # Botから削除されたコマンドはここで出てこないので登録されない。
+        def build():
+            global _build_slash_commands
+            _build_slash_commands = None
+            _replace_atp(
+                True, exceptions["replace_invalid_annotation_to_str"],
+                replace_invalid_annotation_to_str
+            )
+            try:
+                for command in bot.walk_commands(): # type: ignore
+                    if command in deferred_commands:
+                        register_command(command, command.cog)
+            finally:
+                _replace_atp(False, None, replace_invalid_annotation_to_str)
+                deferred_commands.clear()
+        _build_slash_commands = build
+
+    if deferred_registration or schema_cache is not None:
+        # `setup_hook`の後にまとめて登録して、引数の情報をファイルに保存する。
+        # `setup_hook`は`@bot.event`で置き換えられるので、それを実行する`login`を拡張する。
+        original_login = bot.login # type: ignore
+        async def new_login(*args, **kwargs):
+            await original_login(*args, **kwargs)
+            build_slash_commands()
+            if schema_cache is not None:
+                schema_cache.save()
+        bot.login = new_login # type: ignore
+
     # コグ追加時に、コグに実装されているコマンドをスラッシュで登録する。
     original_inject = commands.Cog._inject
     def new_inject(self: commands.Cog, *args, **kwargs):
@@ -464,50 +1231,99 @@ def extend_force_slash(
     # コグ削除時に、コグに実装されているコマンドが削除されるようにする。
     original_remove_cog = commands.bot.BotBase.remove_cog
     async def new_remove_cog(self: commands.bot.BotBase, name: str, /, *args, **kwargs):
-        if name in self.cogs:
-            if hasattr(self.cogs[name], "__fslash_app_commands__"):
-                setattr(
-                    self.cogs[name], "__cog_app_commands__",
-                    getattr(self.cogs[name], "__fslash_app_commands__")
-                )
-            if hasattr(self.cogs[name], "__fslash_app_groups__"):
-                setattr(
-                    self.cogs[name], "__cog_app_commands_group__",
-                    getattr(self.cogs[name], "__fslash_app_groups__")
-                )
-            # fsparentで親コマンドが指定されているコマンドを削除する。
-            if hasattr(self.cogs[name], "__fslash_app_parent_commands__"):
-                for command in getattr(self.cogs[name], "__fslash_app_parent_commands__"):
-                    command.parent.remove_command(command.name)
+        cog = self.cogs.get(name)
+        if cog is not None:
+            for command in cog.walk_commands():
+                slashes.unregister(command)
         return await original_remove_cog(self, name, *args, **kwargs)
     commands.bot.BotBase.remove_cog = new_remove_cog
 
-    # コマンドが削除された時はスラッシュコマンドも削除する。
-    def command_new_del(command: commands.Command):
-        slash: Optional[app_commands.Command] = getattr(command, "__fslash__", None);
-        if slash is not None:
-            if slash.parent is None:
-                bot.tree.remove_command(slash) # type: ignore
-            else:
-                slash.parent.remove_command(slash) # type: ignore
-    setattr(commands.Command, "__del__", command_new_del)
+    # コマンドが削除された時に、ガベージコレクションを待たずにスラッシュコマンドを削除する。
+    original_remove_command = commands.GroupMixin.remove_command
+    def new_remove_command(self: commands.GroupMixin, name: str, /):
+        command = original_remove_command(self, name)
+        # 別名だけが削除された場合は何もしない。
+        if command is not None and name not in command.aliases:
+            if isinstance(command, commands.Group):
+                for subcommand in command.walk_commands():
+                    slashes.unregister(subcommand, False)
+            slashes.unregister(command)
+        return command
+    commands.GroupMixin.remove_command = new_remove_command
+
+    slashes.on_remove = remove_slash
+
+    # 拡張機能の再読み込み時は、元のコマンドのスラッシュコマンドを取って置いて、変わっていないものを使い回す。
+    original_reload_extension = commands.bot.BotBase.reload_extension
+    async def new_reload_extension(
+        self: commands.bot.BotBase, name: str, *, package: Optional[str] = None
+    ):
+        global _reloading
+        module = self._resolve_name(name, package)
+        _reloading = {}
+        for command in self.walk_commands():
+            if command.module is not None and (
+                command.module == module or command.module.startswith(f"{module}.")
+            ) and (slash := slashes.unregister(command, False)) is not None:
+                _reloading[command.qualified_name] = _Stashed(
+                    command, slash, _make_fingerprint(command),
+                    _get_scopes(command, slash.parent)
+                )
+        try:
+            return await original_reload_extension(self, name, package=package)
+        finally:
+            # 使い回されなかったスラッシュコマンドは削除する。
+            # discord.pyがtreeから既に削除している場合があるので、ギルドのスコープは取って置いたものを使う。
+            stashed, _reloading = _reloading, None
+            for entry in stashed.values():
+                remove_slash(entry.slash)
+                _changed_scopes.update(entry.scopes)
+    commands.bot.BotBase.reload_extension = new_reload_extension
 
     @bot.listen("on_ready")
     async def _add_groups():
-        # `groups`にあるものを追加する。
-        global groups
-        for group in groups:
-            if not getattr(group, "__synced__", False) \
-                    and group.parent is None:
-                bot.tree.add_command(group)
-                setattr(group, "__synced__", True)
+        # `groups`にあるまだ追加していないものを追加する。
+        for group in groups.pop_unsynced():
+            bot.tree.add_command(group)
+            setattr(group, "__synced__", True)
 
     # `sync`が実行された際に`_add_groups`を実行する様にする。
     original_sync = app_commands.CommandTree.sync
+    # 同期したコマンドです。同期しなかった場合に返す。
+    synced_commands: dict[str, list[app_commands.AppCommand]] = {}
     async def new_sync(self, *, guild=None):
+        # `setup_hook`の中で同期する場合は、まだまとめて登録していないのでここで登録する。
+        build_slash_commands()
         if bot.is_ready():
             await _add_groups()
-        return await original_sync(self, guild=guild)
+        scope = None if guild is None else guild.id
+        _skipped_scopes.discard(scope)
+        if sync_store is None:
+            synced = await original_sync(self, guild=guild)
+        else:
+            # 前回同期した時とコマンドの内容が同じなら同期しない。
+            key = f"{self.client.application_id}:{'global' if guild is None else guild.id}"
+            payload_hash = await make_payload_hash(self, guild)
+            force, synced = _forcing_sync.get(), None
+            if force or await sync_store.get(key) != payload_hash:
+                if sync_lock is None:
+                    synced = await original_sync(self, guild=guild)
+                    await sync_store.set(key, payload_hash)
+                else:
+                    # ロックを取ったプロセスだけが同期する。待っていたプロセスは、同期が終わって保存されたハッシュを見て同期しない。
+                    async with sync_lock.hold(key):
+                        if force or await sync_store.get(key) != payload_hash:
+                            synced = await original_sync(self, guild=guild)
+                            await sync_store.set(key, payload_hash)
+            if synced is None:
+                # 同期しなかった場合も、discord.pyと同じようにDiscordにあるコマンドを返す。
+                _skipped_scopes.add(scope)
+                synced = synced_commands.get(key)
+                if synced is None:
+                    synced = await self.fetch_commands(guild=guild)
+            synced_commands[key] = synced
+        _changed_scopes.discard(scope)
+        return synced
     app_commands.CommandTree.sync = new_sync
 
     return bot
\ No newline at end of file
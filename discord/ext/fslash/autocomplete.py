@@ -0,0 +1,68 @@
+# discord-ext-fslash - Autocomplete
+
+from __future__ import annotations
+
+from typing import Optional
+
+from discord import app_commands
+
+
+__all__ = ("CommandTrie",)
+
+
+class _Node:
+    __slots__ = ("children", "choices")
+
+    def __init__(self):
+        self.children: dict[str, _Node] = {}
+        self.choices: list[app_commands.Choice[str]] = []
+
+
+class CommandTrie:
+    """Prefix trie of the paths of subcommands.
+    It is used for the autocomplete of `content` of the command that fslash makes instead of over-nested subcommands.
+    The suggestions are made when a path is inserted, so `search` only follows the characters of the prefix.
+
+    Parameters
+    ----------
+    limit : int, default 25
+        The maximum number of suggestions of each prefix. Discord shows up to 25."""
+
+    __slots__ = ("limit", "_root")
+
+    def __init__(self, limit: int = 25):
+        self.limit = limit
+        self._root = _Node()
+
+    def insert(self, path: str, signature: Optional[str] = None) -> None:
+        """Adds the path of a subcommand.
+
+        Parameters
+        ----------
+        path : str
+            The names of the subcommands separated by spaces, such as `level3 level4`.
+        signature : str, optional
+            The signature of the arguments of the subcommand. It is shown after the path."""
+        choice = app_commands.Choice(
+            name=f"{path} {signature}"[:100] if signature else path[:100], value=path[:100]
+        )
+        node = self._root
+        if len(node.choices) < self.limit:
+            node.choices.append(choice)
+        for char in path:
+            node = node.children.setdefault(char, _Node())
+            if len(node.choices) < self.limit:
+                node.choices.append(choice)
+
+    def search(self, prefix: str) -> list[app_commands.Choice[str]]:
+        """Gets the paths that start with the prefix.
+
+        Parameters
+        ----------
+        prefix : str"""
+        node = self._root
+        for char in prefix.lstrip():
+            node = node.children.get(char) # type: ignore
+            if node is None:
+                return []
+        return node.choices
@@ -0,0 +1,68 @@
+# discord-ext-fslash - Cache
+
+from __future__ import annotations
+
+from typing import Generic, TypeVar, Hashable, Optional, Any
+
+from collections import OrderedDict
+from time import monotonic
+
+
+__all__ = ("TTLCache",)
+
+
+KT = TypeVar("KT", bound=Hashable)
+VT = TypeVar("VT")
+_MISSING = object()
+
+
+class TTLCache(Generic[KT, VT]):
+    """Cache whose values expire after a while.
+    If the number of values exceeds `maxsize`, the least recently used value is removed.
+
+    Parameters
+    ----------
+    ttl : float, default 60.0
+        How many seconds a value is kept.
+    maxsize : int, default 1024
+        The maximum number of values."""
+
+    def __init__(self, ttl: float = 60.0, maxsize: int = 1024):
+        self.ttl, self.maxsize = ttl, maxsize
+        self._data: OrderedDict[KT, tuple[float, VT]] = OrderedDict()
+
+    def get(self, key: KT, default: Optional[Any] = None) -> Any:
+        """Gets a value. If it does not exist or has expired, `default` is returned.
+
+        Parameters
+        ----------
+        key : Hashable
+        default : Any, optional"""
+        item = self._data.get(key)
+        if item is None:
+            return default
+        if item[0] < monotonic():
+            del self._data[key]
+            return default
+        self._data.move_to_end(key)
+        return item[1]
+
+    def __setitem__(self, key: KT, value: VT) -> None:
+        self._data[key] = (monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def __delitem__(self, key: KT) -> None:
+        del self._data[key]
+
+    def __contains__(self, key: object) -> bool:
+        return self.get(key, _MISSING) is not _MISSING # type: ignore
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def clear(self) -> None:
+        "Removes all values."
+        self._data.clear()
+
@@ -2,8 +2,9 @@
 
 from __future__ import annotations
 
-from typing import Generic, Union, Optional, Any
+from typing import Callable, Generic, Union, Optional, Any
 
+from asyncio import Lock, Task, TimerHandle, ensure_future, get_running_loop, wait
 from datetime import datetime
 
 from discord.ext.commands.view import StringView
@@ -11,6 +12,48 @@ from discord.ext import commands
 import discord
 
 from .types_ import BotT, TypingMode, InteractionResponseMode
+from . import metrics
+
+
+_MERGEABLE_KWARGS = {"embed", "embeds"}
+
+
+def _coalesce(buffer: list[tuple[Any, dict[str, Any]]]) -> list[dict[str, Any]]:
+    # 続けて送られたメッセージを、内容と埋め込みだけの場合はできるだけ一つのメッセージにまとめる。
+    messages: list[dict[str, Any]] = []
+    mergeable = False
+    for content, kwargs in buffer:
+        # `ctx.send(42)`のように文字列以外が渡された場合は、discord.pyと同じように文字列にする。
+        if content is not None:
+            content = str(content)
+        if "embed" in kwargs:
+            kwargs["embeds"] = [kwargs.pop("embed")]
+        if mergeable and _MERGEABLE_KWARGS.issuperset(kwargs):
+            last = messages[-1]
+            merged_content = "\n".join(
+                text for text in (last.get("content"), content) if text is not None
+            ) or None
+            embeds = [*last.get("embeds", ()), *kwargs.get("embeds", ())]
+            if len(merged_content or "") <= 2000 and len(embeds) <= 10:
+                last["content"] = merged_content
+                if embeds:
+                    last["embeds"] = embeds
+                continue
+        messages.append({"content": content, **kwargs})
+        mergeable = _MERGEABLE_KWARGS.issuperset(kwargs)
+    return messages
+
+
+_MISSING: Any = object()
+def _assignable(getter: Callable[[Context], Any]) -> Any:
+    # インタラクションから取り出す属性のプロパティを作る。`commands.Context`と同じように代入もでき、代入された値を優先する。
+    name = getter.__name__
+    def get(self: Context) -> Any:
+        value = self.__dict__.get(name, _MISSING)
+        return getter(self) if value is _MISSING else value
+    def set_(self: Context, value: Any) -> None:
+        self.__dict__[name] = value
+    return property(get, set_, doc=getter.__doc__)
 
 
 class NewTyping:
@@ -23,12 +66,9 @@ class NewTyping:
         else:
             if self.ctx.typing_mode == TypingMode.TYPING:
                 await self.channel.typing() # type: ignore
-            elif self.ctx.typing_mode.name.startswith("DEFER"):
-                await self.ctx.interaction.response.defer(
-                    ephemeral=self.ctx.typing_mode.name.endswith("EPHEMERAL"),
-                    thinking="THINKING" in self.ctx.typing_mode.name
-                )
-                self.ctx._sended_defer = True
+            elif self.ctx.typing_mode.name.startswith("DEFER") \
+                    and not self.ctx.interaction.response.is_done():
+                await self.ctx._defer()
 
     async def __aexit__(self, *_):
         ...
@@ -79,76 +119,265 @@ class Context(Generic[BotT]):
     typing_mode : types_.TypingMode, default types_.TypingMode.DEFER_THINKING
         Sets the behavior when `Context.typing` and `Context.typing` is executed.  
         You can use `defer` in the interaction response instead.  
-        The `Context.reply` can still be used afterwards."""
+        The `Context.reply` can still be used afterwards.
+    buffer_responses : bool, default False
+        Whether to buffer the interaction responses made by `Context.send` and `Context.reply` and send them together.  
+        The buffered responses are sent when the command returns or `flush_delay` seconds after the first one, with the fewest possible responses and followups.  
+        Responses with only content and embeds are merged into one message as long as they fit in a message.  
+        While it is enabled, `Context.send` and `Context.reply` return this `Context` instead of the response.
+    flush_delay : float, default 1.0
+        How many seconds the buffered responses wait at most before they are sent.
+    auto_defer : float, optional
+        How many seconds to wait before `defer` is sent automatically if nothing has responded to the interaction.  
+        An interaction fails if it is not responded within 3 seconds, so this is useful for slow commands.  
+        The `defer` follows `typing_mode`, and later replies edit the response like after `Context.typing`."""
 
     __fslash__ = True
+    __slots__ = (
+        "bot", "interaction", "_state", "command", "args", "kwargs",
+        "command_failed", "subcommand_passed", "invoked_subcommand", "invoked_with",
+        "current_parameter", "current_argument", "typing_mode", "interaction_response_mode",
+        "_sended_defer", "_view", "_invoked_parents", "_mentions", "_attachments",
+        "buffer_responses", "flush_delay", "_buffer", "_flush_handle", "_flush_lock",
+        "_edited_defer", "auto_defer", "_defer_handle", "_defer_task", "_flush_tasks",
+        "__fslash_do_original_pa__",
+        "__dict__"
+    )
+
+    valid = True
+    prefix = "/"
+    clean_prefix = "/"
+    edited_at: Optional[datetime] = None
+    _emojis = ""
 
     def __init__(
         self, interaction: discord.Interaction, kwargs: dict[str, Any],
         command: Optional[Union[commands.Command, commands.Group]] = None,
         bot: Optional[BotT] = None,
         interaction_response_mode: InteractionResponseMode = InteractionResponseMode.REPLY,
-        typing_mode: TypingMode = TypingMode.DEFER_THINKING
+        typing_mode: TypingMode = TypingMode.DEFER_THINKING,
+        buffer_responses: bool = False, flush_delay: float = 1.0,
+        auto_defer: Optional[float] = None
     ):
-        self.bot, self.interaction, self._state = bot, interaction, bot._connection
-
-        self.message = interaction.message or self
-        self.mentions = []
-        self.guild = interaction.guild
-        self.author = interaction.user
-        self.channel = interaction.channel or interaction.user
-        self.fetch_message = self.channel.fetch_message # type: ignore
-        self.history = self.channel.history # type: ignore
-        self.pins = self.channel.pins # type: ignore
-        if self.guild is None:
-            self.me, self.voice_client = None, None
-        else:
-            self.me = self.guild.me
-            self.voice_client = self.guild.voice_client
+        self.bot, self.interaction, self._state = bot, interaction, bot._connection # type: ignore
+        self.command, self.args, self.kwargs = command, (), kwargs
 
-        self.valid = True
-        self.prefix = "/"
-        self.clean_prefix = "/"
-        self.cog = None if command is None else command.cog
         self.command_failed = False
         self.subcommand_passed = None
         self.invoked_subcommand = None
-
-        self.edited_at: Optional[datetime] = None
-        self.created_at = interaction.created_at
-
-        self.command, self.app_command = command, getattr(command, "__fslash__", None)
-        self.args, self.kwargs = (), kwargs
-
-        if self.command is None:
-            self.reinvoke, self.invoke = None, None
-        else:
-            self.reinvoke = self.command.reinvoke
-
-        self.view = StringView("")
-        self.invoked_parents: list[Any] = []
         self.invoked_with = None
-        self.edit = self._reply
-        self.attachments = []
+        self.current_parameter = None
+        self.current_argument = None
 
         self.typing_mode = typing_mode
         self.interaction_response_mode = interaction_response_mode
         self._sended_defer = False
-        self._emojis = ""
+        self._view = self._invoked_parents = self._mentions = self._attachments = None
+
+        self.buffer_responses, self.flush_delay = buffer_responses, flush_delay
+        self._buffer: list[tuple[Any, dict[str, Any]]] = []
+        self._flush_handle: Optional[TimerHandle] = None
+        # asyncioはタスクを弱参照でしか持たないので、終わるまでここで持って置く。
+        self._flush_tasks: set[Task] = set()
+        self._flush_lock: Optional[Lock] = None
+        self._edited_defer = False
+        # 送信中の`defer`のタスクです。応答はこれが終わるのを待ってから送る。
+        self._defer_task: Optional[Task] = None
+
+        # 応答がないまま`auto_defer`秒経ったら`defer`をする。最初の応答でキャンセルされる。
+        self.auto_defer = auto_defer
+        self._defer_handle: Optional[TimerHandle] = None if auto_defer is None \
+            else get_running_loop().call_later(auto_defer, self._schedule_auto_defer)
+
+    @_assignable
+    def message(self) -> Any:
+        return self.interaction.message or self
+
+    @_assignable
+    def guild(self) -> Optional[discord.Guild]:
+        return self.interaction.guild
+
+    @_assignable
+    def author(self) -> Union[discord.Member, discord.User]:
+        return self.interaction.user
+
+    @_assignable
+    def channel(self) -> Any:
+        return self.interaction.channel or self.interaction.user
+
+    @_assignable
+    def created_at(self) -> datetime:
+        return self.interaction.created_at
+
+    @_assignable
+    def me(self) -> Optional[discord.Member]:
+        return None if self.guild is None else self.guild.me
+
+    @_assignable
+    def voice_client(self) -> Optional[discord.VoiceProtocol]:
+        return None if self.guild is None else self.guild.voice_client
+
+    @_assignable
+    def fetch_message(self) -> Any:
+        return self.channel.fetch_message
+
+    @_assignable
+    def history(self) -> Any:
+        return self.channel.history
+
+    @_assignable
+    def pins(self) -> Any:
+        return self.channel.pins
+
+    @property
+    def view(self) -> StringView:
+        if self._view is None:
+            self._view = StringView("")
+        return self._view
+
+    @view.setter
+    def view(self, view: StringView) -> None:
+        self._view = view
+
+    @property
+    def invoked_parents(self) -> list[Any]:
+        if self._invoked_parents is None:
+            self._invoked_parents = []
+        return self._invoked_parents
+
+    @invoked_parents.setter
+    def invoked_parents(self, invoked_parents: list[Any]) -> None:
+        self._invoked_parents = invoked_parents
+
+    @property
+    def mentions(self) -> list[Any]:
+        if self._mentions is None:
+            self._mentions = []
+        return self._mentions
+
+    @mentions.setter
+    def mentions(self, mentions: list[Any]) -> None:
+        self._mentions = mentions
+
+    @property
+    def attachments(self) -> list[discord.Attachment]:
+        if self._attachments is None:
+            self._attachments = []
+        return self._attachments
+
+    @attachments.setter
+    def attachments(self, attachments: list[discord.Attachment]) -> None:
+        self._attachments = attachments
+
+    @property
+    def cog(self) -> Optional[commands.Cog]:
+        return None if self.command is None else self.command.cog
+
+    @property
+    def app_command(self) -> Any:
+        from . import slashes
+        return None if self.command is None else slashes.get_slash(self.command)
+
+    @property
+    def reinvoke(self) -> Any:
+        return None if self.command is None else self.command.reinvoke
+
+    def _cancel_auto_defer(self) -> None:
+        if self._defer_handle is not None:
+            self._defer_handle.cancel()
+            self._defer_handle = None
+
+    def _on_first_response(self) -> None:
+        self._cancel_auto_defer()
+        metrics.record_first_response(self.interaction)
+
+    async def _send_defer(self) -> None:
+        # `typing_mode`に合わせて`defer`をする。
+        await self.interaction.response.defer(
+            ephemeral=self.typing_mode.name.endswith("EPHEMERAL"),
+            thinking="THINKING" in self.typing_mode.name
+        )
+        self._sended_defer = True
+        self._on_first_response()
+
+    async def _defer(self) -> None:
+        # 既に`defer`を送っている途中なら、二回送らずにそれを待つ。
+        if self._defer_task is None:
+            self._defer_task = ensure_future(self._send_defer())
+        await self._defer_task
+
+    async def _wait_defer(self) -> None:
+        if self._defer_task is not None and not self._defer_task.done():
+            await wait((self._defer_task,))
+
+    def _schedule_auto_defer(self) -> None:
+        self._defer_handle = None
+        if not self.interaction.response.is_done() and self._defer_task is None:
+            self._defer_task = ensure_future(self._send_defer())
+
+    def _schedule_flush(self) -> None:
+        self._flush_handle = None
+        task = ensure_future(self.flush())
+        self._flush_tasks.add(task)
+        task.add_done_callback(self._flush_tasks.discard)
 
     async def invoke(self, command, *args, **kwargs):
         return await command(self, *args, **kwargs)
 
     async def _reply(self, content, kwargs):
+        if self.buffer_responses:
+            # 応答を溜めて置いて、後でまとめて送る。
+            self._buffer.append((content, kwargs))
+            if self._flush_handle is None:
+                self._flush_handle = get_running_loop().call_later(
+                    self.flush_delay, self._schedule_flush
+                )
+            return self
+        await self._wait_defer()
         if self._sended_defer:
             if content is not None:
                 kwargs["content"] = content
             await self.interaction.edit_original_response(**kwargs)
             return self
         else:
-            return await self.interaction.response.send_message(
+            # 応答を送っている間に自動の`defer`が送られないようにする。
+            self._cancel_auto_defer()
+            response = await self.interaction.response.send_message(
                 content, **kwargs
             )
+            self._on_first_response()
+            return response
+
+    edit = _reply
+
+    async def _send_buffered(self, kwargs: dict[str, Any]) -> None:
+        # 最初は応答かdeferの応答の編集で送り、それ以降はフォローアップで送る。
+        await self._wait_defer()
+        if not self.interaction.response.is_done():
+            self._cancel_auto_defer()
+            await self.interaction.response.send_message(**kwargs)
+            self._on_first_response()
+        elif self._sended_defer and not self._edited_defer:
+            self._edited_defer = True
+            kwargs.pop("ephemeral", None)
+            await self.interaction.edit_original_response(**kwargs)
+        else:
+            await self.interaction.followup.send(**kwargs)
+
+    async def flush(self) -> None:
+        """Sends the responses buffered by `buffer_responses`.
+        It is called automatically, so you usually do not need to call it."""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if not self._buffer:
+            return
+        buffer, self._buffer = self._buffer, []
+        if self._flush_lock is None:
+            self._flush_lock = Lock()
+        async with self._flush_lock:
+            for kwargs in _coalesce(buffer):
+                await self._send_buffered(kwargs)
 
     async def reply(self, content: Optional[str] = None, **kwargs):
         if self.interaction_response_mode in (
@@ -173,6 +402,84 @@ class Context(Generic[BotT]):
     async def remove_reaction(self, _, __): ...
 
 
+class OfficialContext(commands.Context):
+    """`discord.ext.commands.Context` that is made directly from an interaction.
+    It is used in `types_.ContextMode.OFFICIAL_LIGHT`.
+
+    Unlike `discord.ext.commands.Context.from_interaction`, it does not make the synthetic message when it is made.  
+    `guild`, `channel` and `author` are taken from the interaction, and the synthetic message is made when `message` is first read.
+
+    Parameters
+    ----------
+    interaction : discord.Interaction
+    kwargs : dict[str, Any]
+    command : Union[discord.ext.commands.Command, discord.ext.commands.Group], optional
+    bot : discord.ext.commands.Bot, optional"""
+
+    __fslash__ = True
+
+    def __init__(
+        self, interaction: discord.Interaction, kwargs: dict[str, Any],
+        command: Optional[Union[commands.Command, commands.Group]] = None,
+        bot: Optional[BotT] = None
+    ):
+        # `commands.Context.__init__`はすぐに`message`を使うので、ここで直接属性を設定する。
+        self.bot, self.interaction, self._state = bot, interaction, interaction._state
+        self.command, self.args, self.kwargs = command, [], kwargs
+        self.prefix = "/"
+        self.view = StringView("")
+        self.invoked_with = None
+        self.invoked_parents = []
+        self.invoked_subcommand = None
+        self.subcommand_passed = None
+        self.command_failed = False
+        self.current_parameter = None
+        self.current_argument = None
+        self._message = interaction.message
+
+    @property
+    def message(self) -> discord.Message: # type: ignore
+        if self._message is None:
+            self._message = self._make_synthetic_message()
+        return self._message
+
+    @message.setter
+    def message(self, message: discord.Message) -> None:
+        self._message = message
+
+    def _make_synthetic_message(self) -> discord.Message:
+        # `commands.Context.from_interaction`と同じ偽のメッセージを作る。
+        interaction = self.interaction
+        message = discord.Message(state=self._state, channel=self.channel, data={ # type: ignore
+            "id": interaction.id, "reactions": [], "embeds": [],
+            "mention_everyone": False, "tts": False, "pinned": False,
+            "edited_timestamp": None, "flags": 64, "content": "",
+            "type": discord.MessageType.chat_input_command.value,
+            "mentions": [], "mention_roles": [], "attachments": []
+        })
+        message.author = interaction.user
+        message.attachments = [
+            value for _, value in interaction.namespace
+            if isinstance(value, discord.Attachment)
+        ]
+        return message
+
+    @discord.utils.cached_property
+    def guild(self) -> Optional[discord.Guild]: # type: ignore
+        return self.interaction.guild
+
+    @discord.utils.cached_property
+    def channel(self) -> Any: # type: ignore
+        return self.interaction.channel or discord.PartialMessageable(
+            state=self._state, guild_id=self.interaction.guild_id,
+            id=self.interaction.channel_id # type: ignore
+        )
+
+    @discord.utils.cached_property
+    def author(self) -> Union[discord.User, discord.Member]: # type: ignore
+        return self.interaction.user
+
+
 def is_fslash(context: Union[Context, commands.Context]) -> bool:
     """Checks if the specified Context is defined by fslash.
 
@@ -0,0 +1,220 @@
+# discord-ext-fslash - Cooldown
+
+from __future__ import annotations
+
+from typing import Callable, TypeVar, Optional, Any
+
+from asyncio import get_running_loop
+from itertools import count
+from threading import Lock
+from time import time
+import sqlite3
+
+
+__all__ = ("CooldownBackend", "MemoryCooldownBackend", "SQLiteCooldownBackend")
+
+
+T = TypeVar("T")
+
+
+def _take(
+    window: float, tokens: int, rate: int, per: float, current: float, number: int
+) -> tuple[float, int, int]:
+    # `commands.Cooldown`と同じように、期間が終わっていればトークンを戻してから取る。
+    # 新しい期間の開始時間と残りのトークンと取れたトークンの数を返す。
+    if current > window + per:
+        window, tokens = current, rate
+    taken = min(number, tokens)
+    return window, tokens - taken, taken
+
+
+class CooldownBackend:
+    """The base class of the storage of the cooldowns and `max_concurrency` of the commands run by a slash.
+    It is used by the `cooldown_backend` argument of `extend_force_slash`.
+    To share them between machines, such as with Redis, inherit this class and implement `update_rate_limit`, `acquire` and `release`."""
+
+    poll_interval = 0.1
+    "How many seconds to wait before trying to acquire again when `max_concurrency` has `wait=True`."
+
+    async def update_rate_limit(
+        self, key: str, rate: int, per: float, current: float
+    ) -> Optional[float]:
+        """Uses a token of the cooldown.
+
+        Parameters
+        ----------
+        key : str
+            It is made from the qualified name of the command and the bucket.
+        rate : int
+            The number of tokens in a period.
+        per : float
+            The length of a period in seconds.
+        current : float
+            The current UNIX time.
+
+        Returns
+        -------
+        float, optional
+            The seconds until it can be used again if there is no token, otherwise `None`."""
+        raise NotImplementedError()
+
+    async def acquire(self, key: str, number: int) -> Any:
+        """Acquires a slot of `max_concurrency`.
+
+        Parameters
+        ----------
+        key : str
+            It is made from the qualified name of the command and the bucket.
+        number : int
+            The maximum number of slots.
+
+        Returns
+        -------
+        Any
+            The object passed to `release`. If all slots are used, `None` is returned."""
+        raise NotImplementedError()
+
+    async def release(self, key: str, token: Any) -> None:
+        """Releases the slot acquired by `acquire`.
+
+        Parameters
+        ----------
+        key : str
+        token : Any
+            The object returned by `acquire`."""
+        raise NotImplementedError()
+
+
+class MemoryCooldownBackend(CooldownBackend):
+    "The backend that keeps the cooldowns in memory. It is not shared between processes."
+
+    def __init__(self):
+        self.buckets: dict[str, tuple[float, int]] = {}
+        self.concurrency: dict[str, int] = {}
+
+    async def update_rate_limit(
+        self, key: str, rate: int, per: float, current: float
+    ) -> Optional[float]:
+        window, tokens = self.buckets.get(key, (0.0, rate))
+        window, tokens, taken = _take(window, tokens, rate, per, current, 1)
+        self.buckets[key] = (window, tokens)
+        if not taken:
+            return per - (current - window)
+
+    async def acquire(self, key: str, number: int) -> Any:
+        if self.concurrency.get(key, 0) >= number:
+            return None
+        self.concurrency[key] = self.concurrency.get(key, 0) + 1
+        return True
+
+    async def release(self, key: str, token: Any) -> None:
+        if (value := self.concurrency.get(key, 0) - 1) > 0:
+            self.concurrency[key] = value
+        else:
+            self.concurrency.pop(key, None)
+
+
+class SQLiteCooldownBackend(CooldownBackend):
+    """The backend that shares the cooldowns between the processes on the same machine with a SQLite file.
+
+    So as not to touch the file each time a command is run, each process leases several tokens at once and uses them in the process.
+    The leased tokens are not given to the other processes until the period ends, so the limit is never exceeded, although a user can be limited a little earlier.
+    `lease=1` makes it exact.
+
+    Parameters
+    ----------
+    path : str, default ".fslash_cooldown.sqlite3"
+        The path of the file.
+    lease : int, default 5
+        How many tokens are leased at once.
+    concurrency_timeout : float, default 900.0
+        How many seconds until a slot of `max_concurrency` is regarded as left by a process that has died, and released."""
+
+    def __init__(
+        self, path: str = ".fslash_cooldown.sqlite3", lease: int = 5,
+        concurrency_timeout: float = 900.0
+    ):
+        self.path, self.lease, self.concurrency_timeout = path, lease, concurrency_timeout
+        # このプロセスが借りているトークンです。期間の開始時間と残りのトークンと、共有のトークンがもうないかどうかを持つ。
+        self.leases: dict[str, tuple[float, int, bool]] = {}
+        self._connection = sqlite3.connect(
+            path, timeout=30.0, isolation_level=None, check_same_thread=False
+        )
+        self._lock = Lock()
+        self._counter = count()
+        with self._lock:
+            self._connection.executescript("""
+                CREATE TABLE IF NOT EXISTS buckets (key TEXT PRIMARY KEY, window REAL, tokens INTEGER, expires REAL);
+                CREATE TABLE IF NOT EXISTS concurrency (id INTEGER PRIMARY KEY AUTOINCREMENT, key TEXT, expires REAL);
+                CREATE INDEX IF NOT EXISTS concurrency_key ON concurrency (key);
+            """)
+
+    async def _run(self, function: Callable[..., T], *args: Any) -> T:
+        # ファイルのロックを待つ間にイベントループを止めないように、別のスレッドで実行する。
+        return await get_running_loop().run_in_executor(None, self._transaction, function, *args)
+
+    def _transaction(self, function: Callable[..., T], *args: Any) -> T:
+        with self._lock:
+            self._connection.execute("BEGIN IMMEDIATE")
+            try:
+                result = function(*args)
+            except BaseException:
+                self._connection.execute("ROLLBACK")
+                raise
+            self._connection.execute("COMMIT")
+            return result
+
+    def _lease(self, key: str, rate: int, per: float, current: float) -> tuple[float, int, bool]:
+        row = self._connection.execute(
+            "SELECT window, tokens FROM buckets WHERE key = ?", (key,)
+        ).fetchone()
+        window, tokens, taken = _take(*(row or (0.0, rate)), rate, per, current, self.lease)
+        self._connection.execute(
+            "INSERT OR REPLACE INTO buckets VALUES (?, ?, ?, ?)",
+            (key, window, tokens, window + per)
+        )
+        # 時々、期間が終わったバケットを消す。
+        if next(self._counter) % 1000 == 0:
+            self._connection.execute("DELETE FROM buckets WHERE expires < ?", (current,))
+        return window, taken, taken < self.lease
+
+    async def update_rate_limit(
+        self, key: str, rate: int, per: float, current: float
+    ) -> Optional[float]:
+        lease = self.leases.get(key)
+        if lease is None or current > lease[0] + per or (lease[1] == 0 and not lease[2]):
+            lease = await self._run(self._lease, key, rate, per, current)
+            if len(self.leases) > 1024:
+                self.leases = {
+                    key_: value for key_, value in self.leases.items()
+                    if current <= value[0] + per
+                }
+        if lease[1] == 0:
+            self.leases[key] = lease
+            return per - (current - lease[0])
+        self.leases[key] = (lease[0], lease[1] - 1, lease[2])
+
+    def _acquire(self, key: str, number: int) -> Optional[int]:
+        current = time()
+        self._connection.execute("DELETE FROM concurrency WHERE expires < ?", (current,))
+        if self._connection.execute(
+            "SELECT COUNT(*) FROM concurrency WHERE key = ?", (key,)
+        ).fetchone()[0] >= number:
+            return None
+        return self._connection.execute(
+            "INSERT INTO concurrency (key, expires) VALUES (?, ?)",
+            (key, current + self.concurrency_timeout)
+        ).lastrowid
+
+    async def acquire(self, key: str, number: int) -> Any:
+        return await self._run(self._acquire, key, number)
+
+    def _release(self, token: int) -> None:
+        self._connection.execute("DELETE FROM concurrency WHERE id = ?", (token,))
+
+    async def release(self, key: str, token: Any) -> None:
+        await self._run(self._release, token)
+
+    def close(self) -> None:
+        "Closes the file."
+        self._connection.close()
@@ -0,0 +1,166 @@
+# discord-ext-fslash - Metrics
+
+from __future__ import annotations
+
+from typing import ContextManager, Optional, Any
+
+from collections import Counter, defaultdict, deque
+from contextlib import nullcontext
+from time import perf_counter
+
+
+__all__ = ("MetricsSink", "MemoryMetricsSink", "STAGES", "COUNTERS")
+
+
+STAGES = ("context", "transform", "checks", "invoke", "first_response")
+"""The names of the stages timed when a command is run by a slash.
+
+* context: Making `ctx`.
+* transform: Running a converter replaced by fslash. It is recorded for each argument.
+* checks: Running the checks.
+* invoke: Running the command.
+* first_response: From the time fslash started to handle the interaction until the first response or defer. It is recorded only with `Context` of fslash."""
+COUNTERS = ("nested_fallback", "check_failure", "error")
+"""The names of the counters.
+
+* nested_fallback: A command was run by the command that takes over-nested subcommands as `content`.
+* check_failure: The checks failed.
+* error: The command raised an error other than a check failure."""
+
+
+class MetricsSink:
+    """The base class of the sink of the metrics of the commands run by a slash.
+    It is used by the `metrics_sink` argument of `extend_force_slash`.
+    To send the metrics somewhere else, such as StatsD or Prometheus, inherit this class and implement `timing` and `increment`.
+    They are called during the command execution, so they should not block."""
+
+    def timing(self, command: str, stage: str, seconds: float) -> None:
+        """Records the time taken by a stage.
+
+        Parameters
+        ----------
+        command : str
+            The qualified name of the command.
+        stage : str
+            One of `STAGES`.
+        seconds : float"""
+        raise NotImplementedError()
+
+    def increment(self, command: str, name: str) -> None:
+        """Increments a counter.
+
+        Parameters
+        ----------
+        command : str
+            The qualified name of the command.
+        name : str
+            One of `COUNTERS`."""
+        raise NotImplementedError()
+
+
+class MemoryMetricsSink(MetricsSink):
+    """The sink that keeps the metrics in memory.
+    It keeps only the latest timings of each command and stage, so percentiles such as p50 and p99 can be taken from it.
+
+    Parameters
+    ----------
+    maxlen : int, default 1024
+        How many timings are kept for each command and stage."""
+
+    def __init__(self, maxlen: int = 1024):
+        self.maxlen = maxlen
+        self.timings: defaultdict[tuple[str, str], deque[float]] = \
+            defaultdict(lambda: deque(maxlen=maxlen))
+        self.counters: Counter[tuple[str, str]] = Counter()
+
+    def timing(self, command: str, stage: str, seconds: float) -> None:
+        self.timings[(command, stage)].append(seconds)
+
+    def increment(self, command: str, name: str) -> None:
+        self.counters[(command, name)] += 1
+
+    def percentile(self, command: str, stage: str, percentile: float) -> Optional[float]:
+        """Gets the percentile of the kept timings.
+
+        Parameters
+        ----------
+        command : str
+        stage : str
+        percentile : float
+            For example, `99` is p99.
+
+        Returns
+        -------
+        float, optional
+            The time in seconds. If there is no timing, `None` is returned."""
+        timings = sorted(self.timings.get((command, stage), ()))
+        if not timings:
+            return None
+        return timings[min(len(timings) - 1, int(len(timings) * percentile / 100))]
+
+    def summary(self) -> dict[str, dict[str, Any]]:
+        """Makes the summary of the metrics for each command.
+
+        Returns
+        -------
+        dict[str, dict[str, Any]]
+            The keys are the qualified names of the commands.
+            The values have `count`, `p50` and `p99` of each stage and the counters."""
+        summary: defaultdict[str, dict[str, Any]] = defaultdict(dict)
+        for (command, stage), timings in self.timings.items():
+            summary[command][stage] = {
+                "count": len(timings),
+                "p50": self.percentile(command, stage, 50),
+                "p99": self.percentile(command, stage, 99)
+            }
+        for (command, name), count in self.counters.items():
+            summary[command][name] = count
+        return dict(summary)
+
+    def clear(self) -> None:
+        "Removes all metrics."
+        self.timings.clear()
+        self.counters.clear()
+
+
+_sink: Optional[MetricsSink] = None
+_NULL_STAGE = nullcontext()
+
+
+class _Stage:
+    __slots__ = ("sink", "command", "stage", "start")
+
+    def __init__(self, sink: MetricsSink, command: str, stage: str):
+        self.sink, self.command, self.stage = sink, command, stage
+
+    def __enter__(self) -> None:
+        self.start = perf_counter()
+
+    def __exit__(self, *_) -> None:
+        self.sink.timing(self.command, self.stage, perf_counter() - self.start)
+
+
+def stage(command: Any, name: str) -> ContextManager[None]:
+    # 計測しない場合は何もしないコンテキストマネージャを返す。
+    if _sink is None:
+        return _NULL_STAGE
+    return _Stage(_sink, getattr(command, "qualified_name", "unknown"), name)
+
+
+def increment(command: Any, name: str) -> None:
+    if _sink is not None:
+        _sink.increment(getattr(command, "qualified_name", "unknown"), name)
+
+
+def start(interaction: Any, command: Any) -> None:
+    # fslashがインタラクションの処理を始めた時間と、その時のコマンドの名前を記録して置く。
+    if _sink is not None:
+        interaction.extras["__fslash_started__"] = (
+            getattr(command, "qualified_name", "unknown"), perf_counter()
+        )
+
+
+def record_first_response(interaction: Any) -> None:
+    # fslashがインタラクションの処理を始めてから最初の応答までの時間を記録する。
+    if _sink is not None and (started := interaction.extras.get("__fslash_started__")):
+        _sink.timing(started[0], "first_response", perf_counter() - started[1])
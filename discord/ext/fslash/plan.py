@@ -0,0 +1,61 @@
+# discord-ext-fslash - Plan
+
+from __future__ import annotations
+
+from typing import NamedTuple, Optional, Any
+
+from weakref import ref
+
+from discord.ext import commands
+
+
+__all__ = ("InvocationPlan", "make_plan")
+
+
+class InvocationPlan(NamedTuple):
+    """What fslash needs to run a command by a slash.
+    It is made once when the command is registered, so these are not computed each time the command is run.
+    You can get it by `get_invocation_plan` for debugging.  
+    It is kept by the command, so it references the command weakly not to make a reference cycle.
+
+    Attributes
+    ----------
+    command_ref : weakref.ref[Union[discord.ext.commands.Command, discord.ext.commands.Group]]
+        The weak reference to the command to run. `command` is the command itself.
+    parents : tuple[discord.ext.commands.Group, ...]
+        The parent commands of the command, from the root.
+    cog : discord.ext.commands.Cog, optional
+        The cog that the command belongs to.
+    context_kwargs : dict[str, Any]
+        Keyword arguments passed to `Context`."""
+
+    command_ref: ref[commands.Command]
+    parents: tuple[commands.Group, ...]
+    cog: Optional[commands.Cog]
+    context_kwargs: dict[str, Any]
+
+    @property
+    def command(self) -> commands.Command:
+        "The command to run."
+        return self.command_ref() # type: ignore
+
+    def make_args(self, ctx: Any) -> tuple[Any, ...]:
+        "Makes `ctx.args` of the command."
+        return (ctx,) if self.cog is None else (self.cog, ctx)
+
+
+def make_plan(
+    command: commands.Command, cog: Optional[commands.Cog], context_kwargs: dict[str, Any]
+) -> InvocationPlan:
+    """Makes `InvocationPlan` of the command.
+
+    Parameters
+    ----------
+    command : Union[discord.ext.commands.Command, discord.ext.commands.Group]
+    cog : discord.ext.commands.Cog, optional
+        The cog that the command belongs to. If it is not passed, `command.cog` is used.
+    context_kwargs : dict[str, Any]
+        Keyword arguments passed to `Context`."""
+    return InvocationPlan(
+        ref(command), tuple(reversed(command.parents)), cog or command.cog, context_kwargs
+    )
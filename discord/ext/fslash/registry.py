@@ -0,0 +1,199 @@
+# discord-ext-fslash - Registry
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Callable, Iterable, Iterator, Union, Optional
+
+from weakref import finalize, ref
+
+from discord import app_commands
+
+if TYPE_CHECKING:
+    from discord.ext import commands
+
+
+__all__ = ("GroupRegistry", "SlashRegistry")
+
+
+SlashT = Union[app_commands.Command, app_commands.Group]
+
+
+def get_scope(guild_ids: Optional[Iterable[int]]) -> Optional[frozenset[int]]:
+    "Makes the key of the guild scope from the guild IDs. `None` means global."
+    return frozenset(guild_ids) if guild_ids else None
+
+
+class GroupRegistry:
+    """Group commands scheduled to be registered with a slash.
+    They are indexed by the name and the guild scope, so looking up a group does not scan all groups.
+    It can be iterated and `append` can be used like the list that was used before.
+
+    Parameters
+    ----------
+    groups : Iterable[discord.app_commands.Group], optional
+        The group commands to be registered first."""
+
+    def __init__(self, groups: Iterable[app_commands.Group] = ()):
+        self._groups: dict[str, dict[Optional[frozenset[int]], app_commands.Group]] = {}
+        self._unsynced: dict[int, app_commands.Group] = {}
+        for group in groups:
+            self.append(group)
+
+    def append(self, group: app_commands.Group) -> None:
+        """Adds a group command.
+        If a group command with the same name and guild scope has already been added, it is replaced.
+
+        Parameters
+        ----------
+        group : discord.app_commands.Group"""
+        scoped = self._groups.setdefault(group.name, {})
+        old = scoped.pop(scope := get_scope(group._guild_ids), None)
+        if old is not None:
+            self._unsynced.pop(id(old), None)
+        scoped[scope] = group
+        if group.parent is None and not getattr(group, "__synced__", False):
+            self._unsynced[id(group)] = group
+
+    def remove(self, group: app_commands.Group) -> None:
+        """Removes a group command.
+
+        Parameters
+        ----------
+        group : discord.app_commands.Group"""
+        scoped = self._groups.get(group.name, {})
+        if scoped.get(scope := get_scope(group._guild_ids)) is group:
+            del scoped[scope]
+            if not scoped:
+                del self._groups[group.name]
+        self._unsynced.pop(id(group), None)
+
+    def get(
+        self, name: str, guild_ids: Optional[Iterable[int]] = None
+    ) -> Optional[app_commands.Group]:
+        """Gets a group command by the name.
+
+        Parameters
+        ----------
+        name : str
+        guild_ids : Iterable[int], optional
+            The guild scope to look up first.
+            If there is no group command in that scope, a group command with the same name in another scope is returned."""
+        scoped = self._groups.get(name)
+        if not scoped:
+            return None
+        return scoped.get(get_scope(guild_ids)) or next(iter(scoped.values()))
+
+    def pop_unsynced(self) -> list[app_commands.Group]:
+        "Returns the top-level group commands that have not yet been added to the tree, and forgets them."
+        unsynced = list(self._unsynced.values())
+        self._unsynced.clear()
+        return unsynced
+
+    def __iter__(self) -> Iterator[app_commands.Group]:
+        for scoped in self._groups.values():
+            yield from scoped.values()
+
+    def __len__(self) -> int:
+        return sum(map(len, self._groups.values()))
+
+    def __contains__(self, group: object) -> bool:
+        return isinstance(group, app_commands.Group) \
+            and self._groups.get(group.name, {}).get(get_scope(group._guild_ids)) is group
+
+    def __repr__(self) -> str:
+        return f"<GroupRegistry groups={list(self)}>"
+
+
+class SlashRegistry:
+    """The slash commands made from the command framework commands.
+    A slash command can be looked up from its command and a command from its slash command without scanning.
+
+    The commands are referenced weakly.  
+    When a command is garbage collected, it is forgotten and `on_remove` is called with its slash command by `weakref.finalize`.  
+    The finalizers do not run at the interpreter shutdown.
+
+    Parameters
+    ----------
+    on_remove : Callable[[Union[discord.app_commands.Command, discord.app_commands.Group]], None], optional
+        The function called with the slash command when it is unregistered or its command is garbage collected.  
+        It is used to remove the slash command from the tree."""
+
+    def __init__(self, on_remove: Optional[Callable[[SlashT], None]] = None):
+        self.on_remove = on_remove
+        self._slashes: dict[int, SlashT] = {}
+        self._commands: dict[int, ref[commands.Command]] = {}
+        self._finalizers: dict[int, finalize] = {}
+
+    def register(self, command: commands.Command, slash: SlashT) -> None:
+        """Records the slash command made from the command.
+        If the command already has a slash command, it is replaced without calling `on_remove`.
+
+        Parameters
+        ----------
+        command : Union[discord.ext.commands.Command, discord.ext.commands.Group]
+        slash : Union[discord.app_commands.Command, discord.app_commands.Group]"""
+        key = id(command)
+        self._forget(key)
+        self._slashes[key] = slash
+        self._commands[id(slash)] = ref(command)
+        finalizer = self._finalizers[key] = finalize(command, self._collect, key)
+        finalizer.atexit = False
+
+    def _forget(self, key: int) -> Optional[SlashT]:
+        finalizer = self._finalizers.pop(key, None)
+        if finalizer is not None:
+            finalizer.detach()
+        slash = self._slashes.pop(key, None)
+        if slash is not None:
+            self._commands.pop(id(slash), None)
+        return slash
+
+    def _collect(self, key: int) -> None:
+        # コマンドがガベージコレクションで消された時に呼ばれる。
+        slash = self._forget(key)
+        if slash is not None and self.on_remove is not None:
+            self.on_remove(slash)
+
+    def unregister(self, command: commands.Command, remove: bool = True) -> Optional[SlashT]:
+        """Forgets the slash command made from the command and calls `on_remove` with it.
+
+        Parameters
+        ----------
+        command : Union[discord.ext.commands.Command, discord.ext.commands.Group]
+        remove : bool, default True
+            Whether to call `on_remove`. If this is `False`, the slash command is only forgotten.
+
+        Returns
+        -------
+        Union[discord.app_commands.Command, discord.app_commands.Group], optional
+            The slash command. If the command has no slash command, `None` is returned."""
+        slash = self._forget(id(command))
+        if remove and slash is not None and self.on_remove is not None:
+            self.on_remove(slash)
+        return slash
+
+    def get_slash(self, command: commands.Command) -> Optional[SlashT]:
+        """Gets the slash command made from the command.
+
+        Parameters
+        ----------
+        command : Union[discord.ext.commands.Command, discord.ext.commands.Group]"""
+        return self._slashes.get(id(command))
+
+    def get_command(self, slash: SlashT) -> Optional[commands.Command]:
+        """Gets the command that the slash command was made from.
+
+        Parameters
+        ----------
+        slash : Union[discord.app_commands.Command, discord.app_commands.Group]"""
+        command = self._commands.get(id(slash))
+        return None if command is None else command()
+
+    def __len__(self) -> int:
+        return len(self._slashes)
+
+    def __contains__(self, command: object) -> bool:
+        return id(command) in self._slashes
+
+    def __repr__(self) -> str:
+        return f"<SlashRegistry slashes={list(self._slashes.values())}>"
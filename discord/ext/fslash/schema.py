@@ -0,0 +1,231 @@
+# discord-ext-fslash - Schema
+
+from __future__ import annotations
+
+from typing import Callable, Union, Optional, Any, get_args, get_origin
+
+from hashlib import sha256
+from json import dumps, loads
+from os.path import exists
+import inspect
+import marshal
+import os
+
+from discord.app_commands.transformers import CommandParameter
+from discord import app_commands
+import discord
+
+
+__all__ = ("ParameterSchemaCache", "make_callback_hash")
+
+
+NoneType = type(None)
+# Python 3.10以降の`X | None`も`Optional`として扱う。
+try:
+    from types import UnionType
+except ImportError:
+    UnionType = Union
+
+
+# キャッシュできるアノテーションです。これ以外のアノテーションの引数があるコマンドはキャッシュしない。
+_ANNOTATIONS: dict[str, Any] = {
+    f"{annotation.__module__}.{annotation.__qualname__}": annotation
+    for annotation in (
+        str, int, float, bool, discord.Member, discord.User, discord.Role,
+        discord.Attachment, discord.TextChannel, discord.VoiceChannel,
+        discord.StageChannel, discord.CategoryChannel, discord.ForumChannel,
+        discord.Thread, discord.abc.GuildChannel
+    )
+}
+_JSON_TYPES = (str, int, float, bool, NoneType)
+
+
+def _stable(value: Any) -> Any:
+    # プロセスごとに変わらない表現にする。関数はアドレスではなく名前とコードにする。
+    if isinstance(value, dict):
+        return sorted((repr(key), _stable(item)) for key, item in value.items())
+    if isinstance(value, (list, tuple)):
+        return [_stable(item) for item in value]
+    if isinstance(value, app_commands.Choice):
+        return ("Choice", value.name, repr(value._locale_name), _stable(value.value))
+    if callable(value) and not isinstance(value, type):
+        function = getattr(value, "__func__", value)
+        code = getattr(function, "__code__", None)
+        return (
+            f"{getattr(function, '__module__', None)}.{getattr(function, '__qualname__', None)}",
+            None if code is None else sha256(marshal.dumps(code)).hexdigest()
+        )
+    return repr(value)
+
+
+def make_callback_hash(func: Callable[..., Any], options: Any = None) -> str:
+    """Makes the hash of what decides the parameters of the slash command made from the callback.
+    It changes when the code, the annotations, the defaults, the docstring or the data of the decorators of the parameters such as `app_commands.describe` of the callback change.
+
+    Parameters
+    ----------
+    func : Callable[..., Any]
+    options : Any, optional
+        Other things that decide the parameters. Its `repr` is used."""
+    return sha256(b"".join((
+        marshal.dumps(func.__code__),
+        repr((
+            _stable(func.__annotations__), _stable(func.__defaults__),
+            _stable(func.__kwdefaults__), func.__doc__,
+            sorted(
+                (name, _stable(value)) for name, value in vars(func).items()
+                if name.startswith("__discord_app_commands_param_")
+            ), options
+        )).encode()
+    ))).hexdigest()
+
+
+def _dump_annotation(annotation: Any) -> Optional[tuple[str, bool]]:
+    # アノテーションを名前と`Optional`かどうかにする。キャッシュできない場合は`None`を返す。
+    optional = False
+    if get_origin(annotation) in (Union, UnionType):
+        args = [arg for arg in get_args(annotation) if arg is not NoneType]
+        if len(args) != 1 or len(args) == len(get_args(annotation)):
+            return None
+        annotation, optional = args[0], True
+    name = f"{getattr(annotation, '__module__', '')}.{getattr(annotation, '__qualname__', '')}"
+    return (name, optional) if _ANNOTATIONS.get(name) is annotation else None
+
+
+def dump_parameters(
+    func: Callable[..., Any], parameters: dict[str, CommandParameter]
+) -> Optional[list[dict[str, Any]]]:
+    "Makes the JSON data of the parameters made from the callback. If they can not be cached, `None` is returned."
+    signature = inspect.signature(func).parameters
+    data = []
+    for name, parameter in parameters.items():
+        original = signature.get(name)
+        if original is None or parameter.autocomplete is not None \
+                or not isinstance(parameter.description, str) \
+                or not isinstance(parameter._rename, (str, type(discord.utils.MISSING))) \
+                or (parameter.default is not discord.utils.MISSING
+                    and not isinstance(parameter.default, _JSON_TYPES)):
+            return None
+        annotation = original.annotation
+        try:
+            annotation = discord.utils.resolve_annotation(
+                annotation, func.__globals__, func.__globals__, {}
+            )
+        except Exception:
+            return None
+        dumped = _dump_annotation(annotation)
+        if dumped is None:
+            return None
+        record: dict[str, Any] = {
+            "name": name, "annotation": dumped[0], "optional": dumped[1],
+            "description": parameter.description
+        }
+        if parameter._rename is not discord.utils.MISSING:
+            record["rename"] = parameter._rename
+        if original.default is not original.empty:
+            if not isinstance(original.default, _JSON_TYPES):
+                return None
+            record["default"] = original.default
+        if parameter.choices:
+            # `locale_str`の名前は翻訳が消えてしまうのでキャッシュしない。
+            if any(
+                choice._locale_name is not None or choice.name_localizations
+                for choice in parameter.choices
+            ):
+                return None
+            record["choices"] = [[choice.name, choice.value] for choice in parameter.choices]
+        data.append(record)
+    return data
+
+
+def load_parameters(
+    data: list[dict[str, Any]], annotation_to_parameter: Callable[..., CommandParameter]
+) -> dict[str, CommandParameter]:
+    "Makes the parameters from the JSON data made by `dump_parameters`."
+    parameters = {}
+    for record in data:
+        annotation = _ANNOTATIONS[record["annotation"]]
+        if record["optional"]:
+            annotation = Optional[annotation]
+        parameter = annotation_to_parameter(annotation, inspect.Parameter(
+            record["name"], inspect.Parameter.POSITIONAL_OR_KEYWORD,
+            default=record.get("default", inspect.Parameter.empty), annotation=annotation
+        ))
+        parameter.description = record["description"]
+        if "rename" in record:
+            parameter._rename = record["rename"]
+        if "choices" in record:
+            parameter.choices = [
+                app_commands.Choice(name=name, value=value) for name, value in record["choices"]
+            ]
+        parameters[parameter.name] = parameter
+    return parameters
+
+
+class ParameterSchemaCache:
+    """The cache of the parameters of the slash commands that is saved to a local JSON file.
+    It is used by the `schema_cache` argument of `extend_force_slash`.
+
+    The parameters of each callback are saved with the hash made by `make_callback_hash`.
+    When the bot starts next time, the parameters are made from the file instead of inspecting the callback, unless the hash has changed.
+    Only parameters whose annotations are basic types such as `str`, `int` and `discord.Member` are cached, and the other callbacks are inspected as usual.
+
+    If the file is broken, it is ignored and made again.
+
+    Parameters
+    ----------
+    path : str, default ".fslash_schema.json"
+        The path of the file."""
+
+    def __init__(self, path: str = ".fslash_schema.json"):
+        self.path = path
+        self._data: dict[str, dict[str, Any]] = {}
+        if exists(path):
+            with open(path, "r") as f:
+                try:
+                    self._data = loads(f.read() or "{}")
+                except ValueError:
+                    # 壊れている場合は、キャッシュがないものとして扱う。
+                    pass
+        self._changed = False
+
+    def get(self, key: str, hash_: str) -> Optional[list[dict[str, Any]]]:
+        """Gets the saved parameters.
+        If there is no parameter, the hash is different or the parameters could not be cached, `None` is returned.
+
+        Parameters
+        ----------
+        key : str
+        hash_ : str"""
+        return self._data[key]["parameters"] if self.has(key, hash_) else None
+
+    def set(self, key: str, hash_: str, parameters: Optional[list[dict[str, Any]]]) -> None:
+        """Saves the parameters. `None` means that the parameters can not be cached.
+
+        Parameters
+        ----------
+        key : str
+        hash_ : str
+        parameters : list[dict[str, Any]], optional"""
+        self._data[key] = {"hash": hash_, "parameters": parameters}
+        self._changed = True
+
+    def has(self, key: str, hash_: str) -> bool:
+        """Checks whether the parameters with the hash have been saved, including the ones that could not be cached.
+
+        Parameters
+        ----------
+        key : str
+        hash_ : str"""
+        entry = self._data.get(key)
+        return entry is not None and entry["hash"] == hash_
+
+    def save(self) -> None:
+        "Writes the parameters to the file. It is called automatically after the bot logs in."
+        if self._changed:
+            # 書いている途中で止まってもファイルが壊れないように、別のファイルに書いてから置き換える。
+            temporary = f"{self.path}.{os.getpid()}.tmp"
+            with open(temporary, "w") as f:
+                f.write(dumps(self._data, ensure_ascii=False))
+            os.replace(temporary, self.path)
+            self._changed = False
@@ -0,0 +1,232 @@
+# discord-ext-fslash - Sync
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, AsyncIterator, Optional, Any
+
+from asyncio import sleep
+from contextlib import asynccontextmanager
+from hashlib import sha256
+from json import dumps, loads
+from os.path import exists
+import inspect
+import os
+
+try:
+    import fcntl
+except ImportError:
+    # Windowsの場合は`msvcrt`でロックする。
+    fcntl = None
+    import msvcrt
+
+from discord import app_commands
+
+if TYPE_CHECKING:
+    import discord
+
+
+__all__ = (
+    "SyncStore", "FileSyncStore", "SyncLock", "FileSyncLock", "make_payload", "make_payload_hash"
+)
+
+
+_PASS_TREE = "tree" in inspect.signature(app_commands.Command.to_dict).parameters
+
+
+async def _lock_file(path: str, poll_interval: float) -> int:
+    # ファイルをOSのロックでロックして、そのファイルディスクリプタを返す。ロックできるまで待つ。
+    fd = os.open(path, os.O_RDWR | os.O_CREAT)
+    try:
+        while True:
+            try:
+                if fcntl is None:
+                    msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+                else:
+                    fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                await sleep(poll_interval)
+            else:
+                return fd
+    except BaseException:
+        os.close(fd)
+        raise
+
+
+def _unlock_file(fd: int) -> None:
+    try:
+        if fcntl is None:
+            os.lseek(fd, 0, os.SEEK_SET)
+            msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+        else:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+    finally:
+        os.close(fd)
+
+
+async def make_payload(
+    tree: app_commands.CommandTree, guild: Optional[discord.abc.Snowflake] = None
+) -> list[dict[str, Any]]:
+    """Makes the payload that `CommandTree.sync` sends to Discord.
+
+    Parameters
+    ----------
+    tree : discord.app_commands.CommandTree
+    guild : discord.abc.Snowflake, optional
+        The guild whose commands are used. If it is not passed, global commands are used."""
+    commands = tree._get_all_commands(guild=guild)
+    if tree.translator:
+        return [
+            await (
+                command.get_translated_payload(tree, tree.translator) if _PASS_TREE
+                else command.get_translated_payload(tree.translator) # type: ignore
+            )
+            for command in commands
+        ]
+    return [
+        command.to_dict(tree) if _PASS_TREE else command.to_dict() # type: ignore
+        for command in commands
+    ]
+
+
+async def make_payload_hash(
+    tree: app_commands.CommandTree, guild: Optional[discord.abc.Snowflake] = None
+) -> str:
+    """Makes the hash of the canonical JSON of the payload made by `make_payload`.
+
+    Parameters
+    ----------
+    tree : discord.app_commands.CommandTree
+    guild : discord.abc.Snowflake, optional"""
+    return sha256(dumps(
+        await make_payload(tree, guild), sort_keys=True,
+        separators=(",", ":"), ensure_ascii=False
+    ).encode()).hexdigest()
+
+
+class SyncStore:
+    """The base class of the store of the hashes of the synced commands.
+    It is used by the `sync_store` argument of `extend_force_slash`.
+    To save the hashes somewhere else, such as a database, inherit this class and implement `get` and `set`."""
+
+    async def get(self, key: str) -> Optional[str]:
+        """Gets the hash saved with the key.
+
+        Parameters
+        ----------
+        key : str
+            It is made from the application ID and the guild ID."""
+        raise NotImplementedError()
+
+    async def set(self, key: str, value: str) -> None:
+        """Saves the hash with the key.
+
+        Parameters
+        ----------
+        key : str
+        value : str"""
+        raise NotImplementedError()
+
+
+class FileSyncStore(SyncStore):
+    """The store of the hashes of the synced commands that uses a local JSON file.
+    While a hash is saved, the file is locked with a lock file next to it, so the hashes saved by several processes at the same time are not lost.
+
+    Parameters
+    ----------
+    path : str, default ".fslash_sync.json"
+        The path of the file.
+    poll_interval : float, default 0.1
+        How many seconds to wait before trying to lock the file again."""
+
+    def __init__(self, path: str = ".fslash_sync.json", poll_interval: float = 0.1):
+        self.path, self.poll_interval = path, poll_interval
+
+    def _load(self) -> dict[str, str]:
+        if exists(self.path):
+            with open(self.path, "r") as f:
+                return loads(f.read() or "{}")
+        return {}
+
+    async def get(self, key: str) -> Optional[str]:
+        return self._load().get(key)
+
+    async def set(self, key: str, value: str) -> None:
+        # 他のプロセスが別のキーを同時に保存しても消えないように、読んでから置き換えるまでロックする。
+        fd = await _lock_file(f"{self.path}.lock", self.poll_interval)
+        try:
+            data = self._load()
+            data[key] = value
+            # 他のプロセスが書きかけのファイルを読まないように、別のファイルに書いてから置き換える。
+            temporary = f"{self.path}.{os.getpid()}.tmp"
+            with open(temporary, "w") as f:
+                f.write(dumps(data, indent=2))
+            os.replace(temporary, self.path)
+        finally:
+            _unlock_file(fd)
+
+
+class SyncLock:
+    """The base class of the lock that decides which process syncs the commands.
+    It is used by the `sync_lock` argument of `extend_force_slash` with `sync_store`.
+
+    When the same bot runs as several processes, only the process that gets the lock first syncs the commands of each guild scope.
+    The other processes wait for the lock, and then they find that the hash saved to `sync_store` is the same, so they do not sync.  
+    To share the lock between machines, such as with Redis, inherit this class and implement `acquire` and `release`."""
+
+    async def acquire(self, key: str) -> None:
+        """Waits until the lock of the key is got.
+
+        Parameters
+        ----------
+        key : str
+            It is made from the application ID and the guild ID."""
+        raise NotImplementedError()
+
+    async def release(self, key: str) -> None:
+        """Releases the lock of the key.
+
+        Parameters
+        ----------
+        key : str"""
+        raise NotImplementedError()
+
+    @asynccontextmanager
+    async def hold(self, key: str) -> AsyncIterator[None]:
+        """Holds the lock of the key while the `async with` block runs.
+
+        Parameters
+        ----------
+        key : str"""
+        await self.acquire(key)
+        try:
+            yield
+        finally:
+            await self.release(key)
+
+
+class FileSyncLock(SyncLock):
+    """The lock that uses local lock files. It works between the processes on the same machine.
+    The lock file of each key is made next to `path`, and it is locked by the OS while the lock is held.  
+    The OS releases the lock when the process dies, so the lock is never left, and a long sync is never taken over by another process.
+
+    Parameters
+    ----------
+    path : str, default ".fslash_sync.lock"
+        The path that the names of the lock files start with.
+    poll_interval : float, default 0.1
+        How many seconds to wait before trying to get the lock again."""
+
+    def __init__(self, path: str = ".fslash_sync.lock", poll_interval: float = 0.1):
+        self.path, self.poll_interval = path, poll_interval
+        self._fds: dict[str, int] = {}
+
+    def _get_path(self, key: str) -> str:
+        return f"{self.path}.{key.replace(':', '-')}"
+
+    async def acquire(self, key: str) -> None:
+        self._fds[key] = await _lock_file(self._get_path(key), self.poll_interval)
+
+    async def release(self, key: str) -> None:
+        fd = self._fds.pop(key, None)
+        if fd is not None:
+            _unlock_file(fd)
@@ -43,6 +43,9 @@ class ContextMode(Enum):
     "Use the standard `Context.from_interaction` in discord.py."
     UNOFFICIAL = 1
     "Use the `Context` provided in `discord-ext-fslash`."
+    OFFICIAL_LIGHT = 2
+    """Use the `OfficialContext` provided in `discord-ext-fslash`.
+    It is a subclass of `Context` in discord.py, but it is made faster than `OFFICIAL`."""
 
 
 BotT = TypeVar("BotT")
\ No newline at end of file
@@ -0,0 +1,7 @@
+# discord-ext-fslash - Tests
+
+import sys
+from pathlib import Path
+
+# リポジトリのfslashと`benchmarks`の偽のオブジェクトを使えるようにする。
+sys.path.insert(0, str(Path(__file__).parent.parent))
@@ -0,0 +1,71 @@
+# discord-ext-fslash - Tests - Converters
+# コンバーターを同時に実行しても、同時に実行する数を守り、引数の順番で最初のエラーが送出されることを確かめます。
+
+from pathlib import Path
+from subprocess import Popen
+import asyncio
+import sys
+
+
+CONCURRENCY = 2
+
+
+def test_concurrent_converters():
+    process = Popen((sys.executable, __file__), cwd=Path(__file__).parent.parent)
+    assert process.wait(timeout=60) == 0
+
+
+async def _run() -> None:
+    from discord.ext import commands
+    from discord import app_commands
+
+    from discord.ext.fslash import extend_force_slash
+    from benchmarks._fakes import FakeInteraction, FakeNamespace, make_bot
+
+    original = app_commands.Command._transform_arguments
+    bot = make_bot()
+    extend_force_slash(bot, converter_concurrency=CONCURRENCY)
+    # fslashが作ったスラッシュコマンド以外には影響しない。
+    assert app_commands.Command._transform_arguments is original
+
+    await bot._async_setup_hook()
+    running, maximum, results = 0, 0, []
+
+    class Slow(commands.Converter):
+        async def convert(self, ctx, argument):
+            nonlocal running, maximum
+            running += 1
+            maximum = max(maximum, running)
+            # 前の引数ほど遅く終わるようにする。
+            await asyncio.sleep(0.1 / int(argument[-1]))
+            running -= 1
+            if argument.startswith("bad"):
+                raise commands.BadArgument(argument)
+            return argument
+
+    @bot.command()
+    async def convert(ctx, a: Slow, b: Slow, c: Slow, d: Slow):
+        results.append((a, b, c, d))
+
+    slash = bot.tree.get_command("convert")
+    assert slash is not None
+    await slash._invoke_with_namespace(
+        FakeInteraction(bot, slash), FakeNamespace(a="ok1", b="ok2", c="ok3", d="ok4")
+    )
+    assert results == [("ok1", "ok2", "ok3", "ok4")]
+    assert maximum == CONCURRENCY
+
+    # 後の引数のエラーの方が先に起きても、前の引数のエラーを送出する。
+    try:
+        await slash._invoke_with_namespace(
+            FakeInteraction(bot, slash), FakeNamespace(a="bad1", b="bad2", c="ok3", d="ok4")
+        )
+    except app_commands.TransformerError as e:
+        assert e.value == "bad1"
+    else:
+        assert False, "The error was not raised."
+
+
+if __name__ == "__main__":
+    sys.path.insert(0, str(Path(__file__).parent.parent))
+    asyncio.run(_run())
@@ -0,0 +1,94 @@
+# discord-ext-fslash - Tests - Cooldown
+# 一つのマシンで複数のプロセスを起動して、クールダウンと同時実行数の制限を合わせて超えないことを確かめます。
+
+from pathlib import Path
+from subprocess import Popen
+from time import time
+import asyncio
+import sys
+
+
+PROCESSES = 5
+RATE = 12
+CONCURRENCY = 2
+
+
+def _start(mode: str, directory: Path, index: int, *args: str) -> Popen:
+    return Popen(
+        (sys.executable, __file__, mode, str(directory), str(index), *args),
+        cwd=Path(__file__).parent.parent
+    )
+
+
+def _wait(processes: list[Popen]) -> None:
+    assert all(process.wait(timeout=60) == 0 for process in processes)
+
+
+def test_rate_is_not_exceeded(tmp_path: Path):
+    for lease in (1, 5):
+        directory = tmp_path / str(lease)
+        directory.mkdir()
+        _wait([_start("rate", directory, index, str(lease)) for index in range(PROCESSES)])
+        taken = sum(
+            int((directory / f"{index}.txt").read_text()) for index in range(PROCESSES)
+        )
+        # 借りたトークンは他のプロセスに渡らないので、少なくなることはあっても多くなることはない。
+        assert 0 < taken <= RATE
+        if lease == 1:
+            assert taken == RATE
+
+
+def test_concurrency_is_not_exceeded(tmp_path: Path):
+    _wait([_start("concurrency", tmp_path, index) for index in range(PROCESSES)])
+    events = sorted(
+        (float(time_), int(delta))
+        for index in range(PROCESSES)
+        for time_, delta in map(str.split, (tmp_path / f"{index}.txt").read_text().splitlines())
+    )
+    assert events
+    # 同じ時間の場合は解放を先に数えて、同時に使われているスロットの最大数を調べる。
+    running = maximum = 0
+    for _, delta in events:
+        running += delta
+        maximum = max(maximum, running)
+    assert maximum <= CONCURRENCY
+
+
+async def _take_rate(directory: Path, index: int, lease: int) -> None:
+    from discord.ext.fslash.cooldown import SQLiteCooldownBackend
+
+    backend = SQLiteCooldownBackend(str(directory / "cooldown.sqlite3"), lease=lease)
+    taken = 0
+    for _ in range(RATE):
+        if await backend.update_rate_limit("command:1", RATE, 60.0, time()) is None:
+            taken += 1
+    backend.close()
+    (directory / f"{index}.txt").write_text(str(taken))
+
+
+async def _hold_slots(directory: Path, index: int) -> None:
+    from discord.ext.fslash.cooldown import SQLiteCooldownBackend
+
+    backend = SQLiteCooldownBackend(str(directory / "cooldown.sqlite3"))
+    events = []
+    for _ in range(10):
+        token = await backend.acquire("command:1", CONCURRENCY)
+        if token is None:
+            await asyncio.sleep(0.01)
+            continue
+        events.append(f"{time()} 1")
+        await asyncio.sleep(0.05)
+        # 取得した後と解放する前に記録するので、記録した区間は実際に持っていた区間に含まれる。
+        events.append(f"{time()} -1")
+        await backend.release("command:1", token)
+    backend.close()
+    (directory / f"{index}.txt").write_text("\n".join(events))
+
+
+if __name__ == "__main__":
+    sys.path.insert(0, str(Path(__file__).parent.parent))
+    directory, index = Path(sys.argv[2]), int(sys.argv[3])
+    asyncio.run(
+        _take_rate(directory, index, int(sys.argv[4])) if sys.argv[1] == "rate"
+        else _hold_slots(directory, index)
+    )
@@ -0,0 +1,97 @@
+# discord-ext-fslash - Tests - Schema
+# 引数の情報のキャッシュが、コールバックが変わった時に使われないことと、保存したものから同じ引数が作られることを確かめます。
+
+from pathlib import Path
+from json import dumps, loads
+from typing import Optional
+
+from discord import app_commands
+import discord
+
+from discord.ext.fslash.schema import (
+    ParameterSchemaCache, make_callback_hash, dump_parameters, load_parameters
+)
+
+
+def _make_callback():
+    async def command(
+        interaction, member: discord.Member, count: int = 1, reason: Optional[str] = None
+    ):
+        ...
+    return command
+
+
+def _extract(func):
+    return app_commands.commands._extract_parameters_from_callback(func, func.__globals__)
+
+
+def test_hash_is_the_same_for_the_same_callback():
+    assert make_callback_hash(_make_callback()) == make_callback_hash(_make_callback())
+    # チェックのような関数のデコレーターは、アドレスではなく名前とコードで比べる。
+    first, second = (app_commands.check(lambda _: True)(_make_callback()) for _ in range(2))
+    assert make_callback_hash(first) == make_callback_hash(second)
+
+
+def test_hash_changes_with_the_callback():
+    original = make_callback_hash(_make_callback())
+
+    annotation = _make_callback()
+    annotation.__annotations__["count"] = float
+    default = _make_callback()
+    default.__defaults__ = (2, None)
+    described = app_commands.describe(count="How many times")(_make_callback())
+    renamed = app_commands.rename(count="times")(_make_callback())
+    choices = app_commands.choices(count=[app_commands.Choice(name="one", value=1)])(
+        _make_callback()
+    )
+    hashes = {
+        make_callback_hash(func)
+        for func in (annotation, default, described, renamed, choices)
+    }
+    assert original not in hashes and len(hashes) == 5
+    assert make_callback_hash(_make_callback(), "options") != original
+
+
+def test_round_trip():
+    func = app_commands.describe(count="How many times")(
+        app_commands.rename(count="times")(
+            app_commands.choices(count=[app_commands.Choice(name="one", value=1)])(
+                _make_callback()
+            )
+        )
+    )
+    parameters = _extract(func)
+    data = dump_parameters(func, parameters)
+    assert data is not None
+    loaded = load_parameters(
+        loads(dumps(data)), app_commands.transformers.annotation_to_parameter
+    )
+    assert [parameter.to_dict() for parameter in loaded.values()] \
+        == [parameter.to_dict() for parameter in parameters.values()]
+    assert [(parameter.name, parameter.default) for parameter in loaded.values()] \
+        == [(parameter.name, parameter.default) for parameter in parameters.values()]
+
+
+def test_uncacheable_parameters():
+    translated = app_commands.choices(count=[
+        app_commands.Choice(name=app_commands.locale_str("one"), value=1)
+    ])(_make_callback())
+    assert dump_parameters(translated, _extract(translated)) is None
+
+    async def command(interaction, value: app_commands.Range[int, 1, 5]):
+        ...
+    assert dump_parameters(command, _extract(command)) is None
+
+
+def test_cache_file(tmp_path: Path):
+    path = tmp_path / "schema.json"
+    cache = ParameterSchemaCache(str(path))
+    cache.set("key", "hash", [])
+    cache.save()
+    assert ParameterSchemaCache(str(path)).get("key", "hash") == []
+    assert ParameterSchemaCache(str(path)).get("key", "other") is None
+    assert list(tmp_path.iterdir()) == [path]
+
+    # 壊れたファイルは無視する。
+    path.write_text('{"key": {"hash": "ha')
+    assert ParameterSchemaCache(str(path)).get("key", "hash") is None
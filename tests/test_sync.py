@@ -0,0 +1,128 @@
+# discord-ext-fslash - Tests - Sync
+# 一つのマシンで複数のプロセスを起動して、同期が一度だけ行われることを確かめます。
+# `extend_force_slash`は一つのプロセスで一度しか実行できないので、それぞれ別のプロセスで実行する。
+
+from json import loads
+from pathlib import Path
+from subprocess import Popen
+import asyncio
+import sys
+
+
+PROCESSES = 5
+KEYS = 20
+
+
+def _start(mode: str, directory: Path) -> Popen:
+    return Popen(
+        (sys.executable, __file__, mode, str(directory)), cwd=Path(__file__).parent.parent
+    )
+
+
+def test_only_one_process_syncs(tmp_path: Path):
+    processes = [_start("lock", tmp_path) for _ in range(PROCESSES)]
+    assert all(process.wait(timeout=60) == 0 for process in processes)
+    assert len((tmp_path / "uploads.txt").read_text().splitlines()) == 1
+
+
+def test_store_keeps_every_key(tmp_path: Path):
+    processes = [_start(f"keys-{index}", tmp_path) for index in range(PROCESSES)]
+    assert all(process.wait(timeout=60) == 0 for process in processes)
+    data = loads((tmp_path / "store.json").read_text())
+    assert len(data) == PROCESSES * KEYS
+
+
+def test_skips_unchanged_sync(tmp_path: Path):
+    assert _start("store", tmp_path).wait(timeout=60) == 0
+    # 再起動した後も同期しないで、Discordにあるコマンドを返す。
+    assert _start("restart", tmp_path).wait(timeout=60) == 0
+
+
+async def _sync(directory: Path) -> None:
+    from discord.ext.fslash.sync import FileSyncStore, FileSyncLock
+    from discord.ext.fslash import extend_force_slash
+    from benchmarks._fakes import FakeHTTP, make_bot
+
+    class RecordingHTTP(FakeHTTP):
+        # アップロードをファイルに記録して、同期に時間がかかるようにする。
+        async def bulk_upsert_global_commands(self, application_id, payload):
+            with open(directory / "uploads.txt", "a") as f:
+                f.write(f"{len(payload)}\n")
+            await asyncio.sleep(0.3)
+            return []
+
+    bot = make_bot()
+    extend_force_slash(
+        bot, sync_store=FileSyncStore(str(directory / "store.json")),
+        sync_lock=FileSyncLock(str(directory / "sync.lock"), poll_interval=0.01)
+    )
+    bot.tree._http = RecordingHTTP() # type: ignore
+
+    @bot.command()
+    async def ping(ctx):
+        ...
+
+    await bot.tree.sync()
+
+
+async def _set_keys(directory: Path, index: str) -> None:
+    from discord.ext.fslash.sync import FileSyncStore
+
+    # 別々のキーを同時に保存する。
+    store = FileSyncStore(str(directory / "store.json"), poll_interval=0.001)
+    for key in range(KEYS):
+        await store.set(f"{index}:{key}", "hash")
+
+
+async def _sync_with_store(directory: Path, restarted: bool) -> None:
+    from discord.ext.fslash.sync import FileSyncStore
+    from discord.ext.fslash import extend_force_slash, get_skipped_scopes, sync_all
+    from benchmarks._fakes import make_bot
+
+    bot = make_bot()
+    extend_force_slash(bot, sync_store=FileSyncStore(str(directory / "store.json")))
+    http = bot.tree._http
+
+    @bot.command()
+    async def ping(ctx):
+        ...
+
+    if restarted:
+        assert await bot.tree.sync() == []
+        assert (http.uploads, http.fetches, get_skipped_scopes()) == ([], [None], {None})
+        return
+
+    assert await bot.tree.sync() == []
+    assert len(http.uploads) == 1 and get_skipped_scopes() == set()
+    # 同じ内容なら同期しないで、前回同期したコマンドを返す。
+    assert await bot.tree.sync() == []
+    assert len(http.uploads) == 1 and get_skipped_scopes() == {None}
+    assert http.fetches == []
+    # `force`なら同じ内容でも同期する。
+    assert await sync_all(force=True) == {None: []}
+    assert len(http.uploads) == 2 and get_skipped_scopes() == set()
+
+    @bot.command()
+    async def pong(ctx):
+        ...
+
+    assert await bot.tree.sync() == []
+    assert len(http.uploads) == 3
+    assert [command["name"] for command in http.uploads[-1][1]] == ["ping", "pong"]
+    # 元に戻すと、Discordにあるコマンドと違うので同期する。
+    bot.remove_command("pong")
+    assert await bot.tree.sync() == []
+    assert len(http.uploads) == 4
+
+
+if __name__ == "__main__":
+    sys.path.insert(0, str(Path(__file__).parent.parent))
+    directory = Path(sys.argv[2])
+    mode = sys.argv[1]
+    if mode.startswith("keys-"):
+        asyncio.run(_set_keys(directory, mode[5:]))
+    else:
+        asyncio.run(
+            _sync(directory) if mode == "lock"
+            else _sync_with_store(directory, mode == "restart")
+        )